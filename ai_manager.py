@@ -1,18 +1,27 @@
 from typing import List, Tuple
 from openai import OpenAI
-from correlation_engine import CorrelationEngine
+from analysis_cache import AnalysisCache
+from context_budget import DEFAULT_CONTEXT_BUDGET
 from data_stores import DataStore
-from goal_analyzer import GoalAnalyzer
-from sprint_status_analyzer import SprintStatusAnalyzer
-from system_generator import SystemContextGenerator
-from wellbeing_analyzer import WellbeingAnalyzer
-from workload_analyzer import WorkloadAnalyzer
+from retrieval_index import RetrievalIndex
+from refresh_scheduler import SnapshotRefresher, jira_sprint_fetcher
+from storage_backends import SQLiteBackend
 
 
 class AIManager:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, snapshot_path: str = None, db_path: str = None,
+                 refresh_interval: float = None, context_budget: int = DEFAULT_CONTEXT_BUDGET):
         self.client = None
-        self.data_store = DataStore()
+        backend = SQLiteBackend(db_path) if db_path else None
+        self.data_store = DataStore(snapshot_path, backend)
+        # Context is capped at `context_budget` tokens (None for the full, unbudgeted context)
+        self.analysis_cache = AnalysisCache(self.data_store, context_budget)
+        self.retrieval_index = RetrievalIndex(self.data_store)
+        self.refresher = None
+        if refresh_interval:
+            # Pull live Jira data in the background instead of blocking chat requests
+            self.refresher = SnapshotRefresher(self.data_store, jira_sprint_fetcher(), refresh_interval)
+            self.refresher.start()
         if api_key:
             self.set_api_key(api_key)
     
@@ -26,28 +35,24 @@ class AIManager:
             return "❌ Please provide a valid OpenAI API key first."
         
         try:
-            # Build conversation history
-            messages = [{"role": "system", "content": SystemContextGenerator.generate_context(
-                sprints=self.data_store.sprints,
-                daily_updates=self.data_store.daily_updates,
-                analysis_results=
-                WorkloadAnalyzer.analyze(self.data_store.workload_data)+
-                GoalAnalyzer.analyze(self.data_store.goal_data) +
-                WellbeingAnalyzer.analyze(self.data_store.daily_updates) +
-                SprintStatusAnalyzer.analyze(self.data_store.sprints),
-                correlation=CorrelationEngine.correlate(
-                    WorkloadAnalyzer.analyze(self.data_store.workload_data)+
-                    GoalAnalyzer.analyze(self.data_store.goal_data) +
-                    WellbeingAnalyzer.analyze(self.data_store.daily_updates) +
-                    SprintStatusAnalyzer.analyze(self.data_store.sprints)
-                ),
-                workload_data=self.data_store.workload_data
-            )}]
-            
+            # One snapshot for the whole message, so a background refresh can't mix versions
+            data = self.data_store.snapshot
+
+            # Analysis and context are only recomputed when the data version changes
+            bundle = self.analysis_cache.get(data)
+            messages = [{"role": "system", "content": bundle.core_context}]
+
+            # The core context leaves out stories, updates and findings: the records relevant
+            # to this question stand in for them, after the history to keep the prefix stable
+            self.retrieval_index.refresh(data, bundle.analysis_results)
+            relevant = self.retrieval_index.context(message)
+
             for user_msg, assistant_msg in history:
                 messages.append({"role": "user", "content": user_msg})
                 messages.append({"role": "assistant", "content": assistant_msg})
             
+            if relevant:
+                messages.append({"role": "system", "content": relevant})
             messages.append({"role": "user", "content": message})
             
             # Get response from OpenAI
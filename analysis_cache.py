@@ -0,0 +1,216 @@
+import threading
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from batch_analyzer import BatchAnalyzer
+from context_budget import BudgetedContextBuilder, ContextReport
+from correlation_engine import CorrelationEngine
+from data_models import AnalysisResult
+from data_stores import ChangeSet, DataSnapshot, DataStore
+from sprint_forecaster import SprintForecast, SprintForecaster
+from sprint_status_analyzer import SprintStatusAnalyzer
+from system_generator import SystemContextGenerator
+from trend_engine import TrendEngine
+
+
+@dataclass(frozen=True)
+class AnalysisBundle:
+    """Analyzer output, correlation, sprint forecast and system contexts computed from one data version."""
+    version: int
+    day: date
+    analysis_results: Tuple[AnalysisResult, ...]
+    correlation: Dict[str, Any]
+    context: str
+    forecast: Optional[SprintForecast]
+    # Per-analyzer results and per-member correlation entries, reused by incremental updates
+    sections: Dict[str, Tuple[AnalysisResult, ...]] = field(default_factory=dict, compare=False, repr=False)
+    sprint_names: Tuple[str, ...] = field(default=(), compare=False, repr=False)
+    member_correlations: Dict[str, Dict[str, List[str]]] = field(default_factory=dict, compare=False, repr=False)
+    context_report: Optional[ContextReport] = field(default=None, compare=False, repr=False)
+    # Trend history of every sprint before the current one; never modified once bundled
+    trends: Optional[TrendEngine] = field(default=None, compare=False, repr=False)
+    # Context without the item sections, for prompts that add retrieved records instead
+    core_context: str = field(default="", compare=False, repr=False)
+
+
+def _merge_rows(rows: Sequence, previous: Sequence[AnalysisResult], dirty: Set[str],
+                analyze: Callable[[List], List[AnalysisResult]]) -> List[AnalysisResult]:
+    """Results for per-member `rows`, re-analyzing only the rows of dirty members.
+
+    A clean member's rows are unchanged since `previous` was computed, so their
+    results are reused in order.
+    """
+    reusable = {}
+    for result in previous:
+        if result.member_id not in dirty:
+            reusable.setdefault(result.member_id, []).append(result)
+    fresh = iter(analyze([row for row in rows if row.member_id in dirty]))
+    reused = {member_id: iter(results) for member_id, results in reusable.items()}
+    return [next(fresh) if row.member_id in dirty else next(reused[row.member_id]) for row in rows]
+
+
+class AnalysisCache:
+    """Keeps the analysis of the latest data version so chat messages don't recompute it.
+
+    Entries are keyed on the snapshot version and on today's date, since the sprint
+    analysis and the story details count days relative to today. Publishing a new
+    snapshot invalidates the entry; concurrent requests for the same version compute it once.
+    A new version is analyzed incrementally from the previous one when the store's change
+    log covers the gap: only changed members and sprints are re-analyzed and re-correlated,
+    and only the context sections whose data changed are rendered again.
+    """
+
+    def __init__(self, data_store: DataStore, context_budget: Optional[int] = None):
+        self.data_store = data_store
+        self.hits = 0
+        self.misses = 0
+        self.incremental = 0      # Misses served by re-analyzing only what changed
+        self._bundle: Optional[AnalysisBundle] = None
+        # With a token budget the context keeps the most important items that fit in it
+        self.context_generator = BudgetedContextBuilder(context_budget) if context_budget \
+            else SystemContextGenerator()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build(snapshot: DataSnapshot, today: Optional[date] = None,
+              generator: Optional[SystemContextGenerator] = None) -> AnalysisBundle:
+        """Analyze a snapshot from scratch, counting days up to `today` (the current date by default).
+
+        A `generator` reuses the context sections it rendered before whose data is unchanged.
+        """
+        today = today or date.today()
+        forecast = SprintForecaster.forecast(snapshot.sprints, today)
+        trends = TrendEngine()
+        sections = {
+            "workload": BatchAnalyzer.analyze_workload(snapshot.workload_data),
+            "goal": BatchAnalyzer.analyze_goals(snapshot.goal_data),
+            "wellbeing": BatchAnalyzer.analyze_wellbeing(snapshot.update_columns()),
+            "sprint": SprintStatusAnalyzer.analyze(snapshot.sprints, forecast=forecast, today=today, trends=trends),
+        }
+        return AnalysisCache._bundle_from(snapshot, sections, {}, forecast, trends, today, generator)
+
+    @staticmethod
+    def update(previous: AnalysisBundle, snapshot: DataSnapshot, changes: ChangeSet,
+               today: Optional[date] = None,
+               generator: Optional[SystemContextGenerator] = None) -> AnalysisBundle:
+        """Analyze a snapshot by re-running only what `changes` touched since `previous`."""
+        today = today or date.today()
+        dirty = changes.members
+        sections = {
+            "workload": _merge_rows(snapshot.workload_data, previous.sections["workload"], dirty,
+                                    BatchAnalyzer.analyze_workload),
+            "goal": _merge_rows(snapshot.goal_data, previous.sections["goal"], dirty,
+                                BatchAnalyzer.analyze_goals),
+            "wellbeing": _merge_rows(snapshot.daily_updates, previous.sections["wellbeing"], dirty,
+                                     BatchAnalyzer.analyze_wellbeing),
+        }
+
+        # A sprint's trend depends on every sprint before it, so re-analyze from the first
+        # sprint that moved or changed; stuck-story checks count days from today, so a new
+        # day re-analyzes every sprint. The current (last) sprint's forecast depends on all
+        # of them, so it is always re-analyzed, as is a previous last sprint that lost its forecast.
+        names = tuple(sprint.sprint_name for sprint in snapshot.sprints)
+        start = 0
+        if previous.day == today:
+            limit = min(len(names), len(previous.sprint_names)) - 1
+            while start < limit and names[start] == previous.sprint_names[start] \
+                    and names[start] not in changes.sprints:
+                start += 1
+        forecast = SprintForecaster.forecast(snapshot.sprints, today)
+        # The previous bundle's trends cover its sprints before the current one: when
+        # re-analysis starts at that sprint, only the sprints after them are added
+        if previous.trends is not None and start == len(previous.sprint_names) - 1:
+            trends = previous.trends.copy()
+        else:
+            trends = TrendEngine.from_sprints(snapshot.sprints[:start])
+        sprint_results = list(previous.sections["sprint"][:start]) + \
+            SprintStatusAnalyzer.analyze(snapshot.sprints, start, forecast, today, trends)
+        sections["sprint"] = sprint_results
+
+        # Correlation entries of members whose results were all reused still hold
+        reused = {id(result) for results in previous.sections.values() for result in results}
+        member_correlations = {
+            member_id: entry for member_id, entry in previous.member_correlations.items()
+            if member_id not in dirty
+        }
+        for results in sections.values():
+            for result in results:
+                if id(result) not in reused:
+                    member_correlations.pop(result.member_id, None)
+        return AnalysisCache._bundle_from(snapshot, sections, member_correlations, forecast, trends, today,
+                                          generator)
+
+    @staticmethod
+    def _bundle_from(snapshot: DataSnapshot, sections: Dict[str, List[AnalysisResult]],
+                     member_correlations: Dict[str, Dict[str, List[str]]],
+                     forecast: Optional[SprintForecast], trends: TrendEngine, today: date,
+                     generator: Optional[SystemContextGenerator] = None) -> AnalysisBundle:
+        """Assemble a bundle, correlating only members missing from `member_correlations`."""
+        analysis_results = sections["workload"] + sections["goal"] + sections["wellbeing"] + sections["sprint"]
+        members = dict.fromkeys(result.member_id for result in analysis_results)     # Order of first analysis
+        fresh = CorrelationEngine.correlate_members(
+            analysis_results, [member_id for member_id in members if member_id not in member_correlations])
+        member_correlations = {
+            member_id: member_correlations[member_id] if member_id in member_correlations else fresh[member_id]
+            for member_id in members
+        }
+        correlation = CorrelationEngine.merge(member_correlations.values())
+        generator = generator or SystemContextGenerator()
+        context = generator.build(
+            sprints=snapshot.sprints,
+            daily_updates=snapshot.daily_updates,
+            analysis_results=analysis_results,
+            correlation=correlation,
+            workload_data=snapshot.workload_data,
+            forecast=forecast,
+            today=today,
+            trends=trends
+        )
+        report = generator.report if isinstance(generator, BudgetedContextBuilder) else None
+        core_context = generator.core(snapshot.sprints, correlation, forecast, today, trends)
+        return AnalysisBundle(
+            snapshot.version, today, tuple(analysis_results), correlation, context, forecast,
+            sections={name: tuple(results) for name, results in sections.items()},
+            sprint_names=tuple(sprint.sprint_name for sprint in snapshot.sprints),
+            member_correlations=member_correlations,
+            context_report=report,
+            trends=trends,
+            core_context=core_context
+        )
+
+    def get(self, snapshot: Optional[DataSnapshot] = None) -> AnalysisBundle:
+        """Bundle for `snapshot` (the store's current one by default), computed only on a miss."""
+        snapshot = snapshot if snapshot is not None else self.data_store.snapshot
+        today = date.today()
+        with self._lock:
+            bundle = self._bundle
+            if bundle is not None and bundle.version == snapshot.version and bundle.day == today:
+                self.hits += 1
+                return bundle
+
+            self.misses += 1
+            changes = None
+            if bundle is not None:
+                changes = self.data_store.changes_since(bundle.version, snapshot.version)
+            if changes is None:
+                bundle = self.build(snapshot, today, self.context_generator)
+            else:
+                self.incremental += 1
+                bundle = self.update(bundle, snapshot, changes, today, self.context_generator)
+            # Never replace a newer version with an older one computed for a slow request
+            if self._bundle is None or self._bundle.version <= bundle.version:
+                self._bundle = bundle
+            return bundle
+
+    def invalidate(self):
+        with self._lock:
+            self._bundle = None
+            self.context_generator.invalidate()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            version = self._bundle.version if self._bundle is not None else None
+            sections = self.context_generator.stats()
+            return {"hits": self.hits, "misses": self.misses, "incremental": self.incremental, "version": version,
+                    "section_hits": sections["hits"], "section_rebuilds": sections["rebuilds"]}
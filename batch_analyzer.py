@@ -0,0 +1,106 @@
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from columnar import UpdateColumns
+from data_models import AnalysisResult, DailyUpdate, GoalData, Signal, WorkloadData
+from sentiment import DEFAULT_LEXICON, SentimentLexicon
+
+RISK_LEVELS = ["low", "medium", "high"]
+LOW, MEDIUM, HIGH = range(3)
+
+# A rule is (mask over all members, signal, flag, recommendation, risk level it raises the member to).
+# Rules keep the order of the checks in the per-member analyzers, so flags come out in the same order.
+Rule = Tuple[np.ndarray, Signal, str, str, int]
+
+
+class BatchAnalyzer:
+    """Whole-team versions of WorkloadAnalyzer, GoalAnalyzer and WellbeingAnalyzer.
+
+    Every threshold is evaluated once as a boolean mask over column arrays; flag and
+    recommendation lists are only built for members who trip at least one rule. The
+    results are identical to the per-member analyzers'.
+    """
+
+    @staticmethod
+    def _materialize(agent_type: str, member_ids: Sequence[str], rules: List[Rule]) -> List[AnalysisResult]:
+        # Each member's signals are the OR of the signals of the rules they trip; members sharing
+        # the same signals share flags, recommendations and risk, so those are resolved once per value
+        signals = np.zeros(len(member_ids), dtype=np.int64)
+        for mask, signal, _, _, _ in rules:
+            signals |= mask.astype(np.int64) * int(signal)
+
+        outcomes = {}
+        for value in np.unique(signals).tolist():
+            tripped = [rule for rule in rules if value & rule[1]]
+            outcomes[value] = (
+                [flag for _, _, flag, _, _ in tripped],
+                [recommendation for _, _, _, recommendation, _ in tripped],
+                RISK_LEVELS[max((level for _, _, _, _, level in tripped), default=LOW)],
+                Signal(value)
+            )
+
+        results = []
+        for member_id, value in zip(member_ids, signals.tolist()):
+            flags, recommendations, risk, signal = outcomes[value]
+            results.append(AnalysisResult(agent_type, member_id, risk, list(flags), list(recommendations), signal))
+        return results
+
+    @staticmethod
+    def analyze_workload(workload_data: Sequence[WorkloadData]) -> List[AnalysisResult]:
+        n = len(workload_data)
+        active = np.fromiter((w.active_tasks for w in workload_data), dtype=np.int64, count=n)
+        overtime = np.fromiter((w.overtime_hours for w in workload_data), dtype=np.int64, count=n)
+        breaches = np.fromiter((w.sla_breaches for w in workload_data), dtype=np.int64, count=n)
+
+        return BatchAnalyzer._materialize("workload", [w.member_id for w in workload_data], [
+            (active > 10, Signal.HIGH_TASK_LOAD, "High task load", "Redistribute tasks", HIGH),
+            (overtime > 10, Signal.EXCESSIVE_OVERTIME, "Excessive overtime", "Reduce workload", HIGH),
+            (breaches > 1, Signal.SLA_VIOLATIONS, "SLA violations detected", "Review deadlines", MEDIUM),
+            ((active < 4) & (overtime < 3), Signal.UNDERUTILIZED, "Underutilized capacity",
+             "Assign more tasks", LOW),
+        ])
+
+    @staticmethod
+    def analyze_goals(goal_data: Sequence[GoalData]) -> List[AnalysisResult]:
+        n = len(goal_data)
+        sprint_goals = np.fromiter((g.sprint_goals for g in goal_data), dtype=np.float64, count=n)
+        completed = np.fromiter((g.completed_goals for g in goal_data), dtype=np.float64, count=n)
+        velocity = np.fromiter((g.velocity for g in goal_data), dtype=np.float64, count=n)
+        expected = np.fromiter((g.expected_completion for g in goal_data), dtype=np.float64, count=n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            completion_rate = completed / sprint_goals
+
+        return BatchAnalyzer._materialize("goal", [g.member_id for g in goal_data], [
+            (completion_rate < 0.5, Signal.LOW_COMPLETION, "Low sprint completion rate",
+             "Review sprint commitments", HIGH),
+            (velocity < expected, Signal.BEHIND_VELOCITY, "Behind velocity", "Assess task complexity", MEDIUM),
+            (completion_rate > 0.9, Signal.EXCEEDING_GOALS, "Exceeding goals", "Increase sprint capacity", LOW),
+        ])
+
+    @staticmethod
+    def analyze_wellbeing(daily_updates: Union[Sequence[DailyUpdate], UpdateColumns],
+                          lexicon: Optional[SentimentLexicon] = None) -> List[AnalysisResult]:
+        columns = daily_updates if isinstance(daily_updates, UpdateColumns) else UpdateColumns(daily_updates)
+        negative = (lexicon or DEFAULT_LEXICON).negative_mask(columns.comments)
+
+        member_ids = [columns.members.values[code] for code in columns.member]
+        return BatchAnalyzer._materialize("wellbeing", member_ids, [
+            (columns.mood_mask("stressed", "burnout"), Signal.HIGH_STRESS, "High stress levels detected",
+             "Schedule 1:1 and reduce load", HIGH),
+            (columns.blocker_counts() > 2, Signal.MULTIPLE_BLOCKERS, "Multiple blockers", "Resolve blockers", MEDIUM),
+            (columns.column("working_hours") > 9, Signal.EXTENDED_HOURS, "Extended working hours",
+             "Monitor hours", MEDIUM),
+            (negative, Signal.NEGATIVE_SENTIMENT, "Negative sentiment in feedback",
+             "Immediate support required", HIGH),
+        ])
+
+    @staticmethod
+    def analyze(workload_data: Sequence[WorkloadData], goal_data: Sequence[GoalData],
+                daily_updates: Union[Sequence[DailyUpdate], UpdateColumns]) -> List[AnalysisResult]:
+        """Workload, goal and wellbeing results, in the order the per-member analyzers are usually chained."""
+        return (
+            BatchAnalyzer.analyze_workload(workload_data) +
+            BatchAnalyzer.analyze_goals(goal_data) +
+            BatchAnalyzer.analyze_wellbeing(daily_updates)
+        )
@@ -0,0 +1,365 @@
+"""
+Columnar containers for large UserStory and DailyUpdate collections.
+
+Each field is stored once per collection as a typed `array` column instead of once per
+object: repeated strings (assignees, statuses, tags, members, moods, blockers,
+achievements) are dictionary encoded into integer codes and dates are integer day
+ordinals. Analyzers can scan the columns directly, optionally as zero-copy NumPy views,
+while existing callers keep working through slotted row views.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from data_models import DailyUpdate, UserStory, date_to_ordinal, ordinal_to_date
+
+NO_POINTS = -1           # Story-points sentinel for "not estimated"
+
+
+class Dictionary:
+    """Dictionary encoding of repeated strings (or None) into dense integer codes."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code_of(self, value: str) -> int:
+        """Code of a value, or -1 if it never occurs (matches nothing in a column)."""
+        return self.codes.get(value, -1)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class _RaggedColumn:
+    """Variable-length lists of dictionary codes in CSR form: one flat code array plus row offsets."""
+
+    __slots__ = ("codes", "offsets", "present")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.offsets = array("i", [0])
+        self.present = array("b")   # 0 when the row's list is None rather than empty
+
+    def append(self, values: Optional[List[str]], dictionary: Dictionary):
+        if values:
+            self.codes.extend(dictionary.encode(value) for value in values)
+        self.offsets.append(len(self.codes))
+        self.present.append(0 if values is None else 1)
+
+    def row(self, index: int, dictionary: Dictionary) -> Optional[List[str]]:
+        if not self.present[index]:
+            return None
+        return [dictionary.values[code] for code in self.codes[self.offsets[index]:self.offsets[index + 1]]]
+
+    def counts(self) -> np.ndarray:
+        return np.diff(np.frombuffer(self.offsets, dtype=np.intc))
+
+
+def _decoded(column: array, dictionary: Dictionary) -> list:
+    values = dictionary.values
+    return [values[code] for code in column]
+
+
+def _view(column: array) -> np.ndarray:
+    """Zero-copy NumPy view of an array column (valid until the column grows)."""
+    return np.frombuffer(column, dtype=np.intc if column.typecode == "i" else np.int8)
+
+
+class StoryColumns:
+    """Column store of one sprint's user stories.
+
+    DataStore keeps published sprints' stories in this form, so 100k stories cost a
+    few integers each instead of an object apiece. It reads like a list of stories:
+    iterating or indexing gives StoryRow views, and it compares equal to a list of
+    UserStory objects with the same data.
+    """
+
+    def __init__(self, stories: Iterable[UserStory] = ()):
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.assignees = Dictionary()
+        self.statuses = Dictionary()
+        self.tags = Dictionary()
+        self.assignee = array("i")
+        self.status = array("i")
+        self.start_day = array("i")
+        self.story_points = array("i")
+        self.tag_lists = _RaggedColumn()
+        self._start_dates: Dict[int, Optional[str]] = {}   # Original text of dates that don't round-trip
+        self.extend(stories)
+
+    @classmethod
+    def of(cls, stories: Iterable[UserStory]) -> "StoryColumns":
+        """`stories` as a column store, built only if it isn't one already."""
+        return stories if isinstance(stories, cls) else cls(stories)
+
+    def append(self, story: UserStory):
+        self.append_fields(story.id, story.title, story.assignee, story.start_date, story.status,
+                           story.story_points, story.tags)
+
+    def append_fields(self, story_id: str, title: str, assignee: Optional[str], start_date: Optional[str],
+                      status: str, story_points: Optional[int] = None, tags: Optional[List[str]] = None):
+        """Append a story given as its UserStory fields, without building the object."""
+        index = len(self.ids)
+        self.ids.append(story_id)
+        self.titles.append(title)
+        self.assignee.append(self.assignees.encode(assignee))
+        self.status.append(self.statuses.encode(status))
+        day = date_to_ordinal(start_date)
+        self.start_day.append(day)
+        if ordinal_to_date(day) != start_date:
+            self._start_dates[index] = start_date
+        self.story_points.append(NO_POINTS if story_points is None else story_points)
+        self.tag_lists.append(tags, self.tags)
+
+    def extend(self, stories: Iterable[UserStory]):
+        for story in stories:
+            self.append(story)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [StoryRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return StoryRow(self, index)
+
+    def __iter__(self) -> Iterator["StoryRow"]:
+        return (StoryRow(self, i) for i in range(len(self)))
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, (StoryColumns, list, tuple)) or len(other) != len(self):
+            return False
+        if isinstance(other, StoryColumns):
+            # Column by column, with codes decoded since each store numbers its strings itself
+            return (self.ids == other.ids and self.titles == other.titles
+                    and self.start_day == other.start_day and self._start_dates == other._start_dates
+                    and self.story_points == other.story_points
+                    and self.tag_lists.offsets == other.tag_lists.offsets
+                    and self.tag_lists.present == other.tag_lists.present
+                    and _decoded(self.assignee, self.assignees) == _decoded(other.assignee, other.assignees)
+                    and _decoded(self.status, self.statuses) == _decoded(other.status, other.statuses)
+                    and _decoded(self.tag_lists.codes, self.tags) == _decoded(other.tag_lists.codes, other.tags))
+        return all(row == story for row, story in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"StoryColumns({len(self)} stories)"
+
+    def column(self, name: str) -> np.ndarray:
+        """NumPy view of an integer column: assignee, status, start_day or story_points."""
+        return _view(getattr(self, name))
+
+    def status_mask(self, *statuses: str, ignore_case: bool = False) -> np.ndarray:
+        if ignore_case:
+            wanted = {status.lower() for status in statuses}
+            codes = [code for code, value in enumerate(self.statuses.values)
+                     if value is not None and value.lower() in wanted]
+        else:
+            codes = [self.statuses.code_of(status) for status in statuses]
+        return np.isin(self.column("status"), codes)
+
+    def assignee_mask(self, *assignees: Optional[str]) -> np.ndarray:
+        codes = [self.assignees.code_of(assignee) for assignee in assignees]
+        return np.isin(self.column("assignee"), codes)
+
+    def tag_counts(self) -> np.ndarray:
+        return self.tag_lists.counts()
+
+    def to_stories(self) -> List[UserStory]:
+        return [row.to_story() for row in self]
+
+
+class StoryRow:
+    """Read-only, attribute-compatible view of one row of a StoryColumns store."""
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: StoryColumns, index: int):
+        self._columns = columns
+        self._index = index
+
+    @property
+    def id(self) -> str:
+        return self._columns.ids[self._index]
+
+    @property
+    def title(self) -> str:
+        return self._columns.titles[self._index]
+
+    @property
+    def assignee(self) -> Optional[str]:
+        return self._columns.assignees.values[self._columns.assignee[self._index]]
+
+    @property
+    def status(self) -> str:
+        return self._columns.statuses.values[self._columns.status[self._index]]
+
+    @property
+    def start_day(self) -> int:
+        return self._columns.start_day[self._index]
+
+    @property
+    def start_date(self) -> Optional[str]:
+        if self._index in self._columns._start_dates:
+            return self._columns._start_dates[self._index]
+        return ordinal_to_date(self.start_day)
+
+    @property
+    def story_points(self) -> Optional[int]:
+        points = self._columns.story_points[self._index]
+        return None if points == NO_POINTS else points
+
+    @property
+    def tags(self) -> Optional[List[str]]:
+        return self._columns.tag_lists.row(self._index, self._columns.tags)
+
+    def _fields(self) -> tuple:
+        return (self.id, self.title, self.assignee, self.start_date, self.status, self.story_points, self.tags)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, StoryRow):
+            if other._columns is self._columns and other._index == self._index:
+                return True
+            return self._fields() == other._fields()
+        if isinstance(other, UserStory):
+            return self._fields() == (other.id, other.title, other.assignee, other.start_date, other.status,
+                                      other.story_points, other.tags)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"StoryRow({self.to_story()!r})"
+
+    def to_story(self) -> UserStory:
+        return UserStory(self.id, self.title, self.assignee, self.start_date, self.status,
+                         self.story_points, self.tags)
+
+
+class UpdateColumns:
+    """Column store of daily updates."""
+
+    def __init__(self, updates: Iterable[DailyUpdate] = ()):
+        self.members = Dictionary()
+        self.moods = Dictionary()
+        self.texts = Dictionary()     # Blockers and achievements share one dictionary
+        self.member = array("i")
+        self.day = array("i")
+        self.mood = array("i")
+        self.working_hours = array("i")
+        self.comments: List[str] = []
+        self.blockers = _RaggedColumn()
+        self.achievements = _RaggedColumn()
+        self._dates: Dict[int, str] = {}
+        self.extend(updates)
+
+    def append(self, update: DailyUpdate):
+        index = len(self.comments)
+        self.member.append(self.members.encode(update.member_id))
+        day = update.day
+        self.day.append(day)
+        if ordinal_to_date(day) != (update.date or ""):
+            self._dates[index] = update.date
+        self.mood.append(self.moods.encode(update.mood))
+        self.working_hours.append(update.working_hours)
+        self.comments.append(update.comments)
+        self.blockers.append(update.blockers, self.texts)
+        self.achievements.append(update.achievements, self.texts)
+
+    def extend(self, updates: Iterable[DailyUpdate]):
+        for update in updates:
+            self.append(update)
+
+    def __len__(self) -> int:
+        return len(self.comments)
+
+    def __getitem__(self, index: int) -> "UpdateRow":
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return UpdateRow(self, index)
+
+    def __iter__(self) -> Iterator["UpdateRow"]:
+        return (UpdateRow(self, i) for i in range(len(self)))
+
+    def column(self, name: str) -> np.ndarray:
+        """NumPy view of an integer column: member, day, mood or working_hours."""
+        return _view(getattr(self, name))
+
+    def mood_mask(self, *moods: str) -> np.ndarray:
+        codes = [self.moods.code_of(mood) for mood in moods]
+        return np.isin(self.column("mood"), codes)
+
+    def blocker_counts(self) -> np.ndarray:
+        return self.blockers.counts()
+
+    def to_updates(self) -> List[DailyUpdate]:
+        return [row.to_update() for row in self]
+
+
+class UpdateRow:
+    """Read-only, attribute-compatible view of one row of an UpdateColumns store."""
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: UpdateColumns, index: int):
+        self._columns = columns
+        self._index = index
+
+    @property
+    def member_id(self) -> str:
+        return self._columns.members.values[self._columns.member[self._index]]
+
+    @property
+    def day(self) -> int:
+        return self._columns.day[self._index]
+
+    @property
+    def date(self) -> str:
+        original = self._columns._dates.get(self._index)
+        return original if original is not None else ordinal_to_date(self.day)
+
+    @property
+    def mood(self) -> str:
+        return self._columns.moods.values[self._columns.mood[self._index]]
+
+    @property
+    def blockers(self) -> List[str]:
+        return self._columns.blockers.row(self._index, self._columns.texts)
+
+    @property
+    def achievements(self) -> List[str]:
+        return self._columns.achievements.row(self._index, self._columns.texts)
+
+    @property
+    def comments(self) -> str:
+        return self._columns.comments[self._index]
+
+    @property
+    def working_hours(self) -> int:
+        return self._columns.working_hours[self._index]
+
+    def to_update(self) -> DailyUpdate:
+        return DailyUpdate(self.member_id, self.date, self.mood, self.blockers, self.achievements,
+                           self.comments, self.working_hours)
@@ -0,0 +1,362 @@
+"""
+Token-budgeted system context.
+
+Fixed sections (sprint info, trend, forecast, team health) are always included, minus
+their optional lines (trend summaries, then forecast details) when they don't fit. The
+per-item sections (findings, recommendations, stories, daily updates, workload) are
+filled greedily in priority order: at-risk stories, updates with blockers and flagged
+members go first. Items that don't fit are replaced by one summary line per section,
+and the builder reports the tokens spent on each section, and by how much a context
+still went over its budget.
+
+Tokens are counted with tiktoken. Its encoding is cached in TOKENIZER_CACHE_DIR instead
+of the system temp dir, so it is downloaded once; run `python context_budget.py` at
+install time to fetch it for hosts without network access. Token counts are only
+estimated, with a warning and tokenizer="estimate" in the report, when the encoding
+can't be loaded.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_analyzer import RISK_LEVELS
+from columnar import NO_POINTS, StoryColumns
+from data_models import DONE_STATUSES, MISSING_DAY, AnalysisResult, DailyUpdate, SprintStatus, UserStory, WorkloadData
+from sprint_forecaster import SprintForecast, SprintForecaster
+from sprint_status_analyzer import STUCK_DAYS
+from system_generator import SystemContextGenerator
+from trend_engine import TrendEngine
+
+import tiktoken
+
+DEFAULT_CONTEXT_BUDGET = 3000
+TOKENIZER_MODEL = "gpt-4"
+TOKENIZER_CACHE_DIR = os.getenv(
+    "TIKTOKEN_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tiktoken_cache")
+)
+
+_WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+
+# Order in which items of different sections with the same tier and rank claim the budget
+SECTION_PRIORITY = ["findings", "recommendations", "stories", "daily_updates", "workload"]
+
+# Optional lines of fixed sections, as (section, is_optional(line number, line)), dropped
+# in this order while the fixed text leaves no room in the budget
+FIXED_TRIM_ORDER: List[Tuple[str, Callable[[int, str], bool]]] = [
+    ("trend", lambda i, line: line.startswith("  ")),       # Rolling summaries under each metric
+    ("forecast", lambda i, line: i > 2),                     # Everything after the on-time chance
+]
+
+
+def load_encoding() -> "tiktoken.Encoding":
+    """The TOKENIZER_MODEL encoding, from TOKENIZER_CACHE_DIR or downloaded into it."""
+    # tiktoken reads its cache location from the environment on every load
+    os.environ["TIKTOKEN_CACHE_DIR"] = TOKENIZER_CACHE_DIR
+    return tiktoken.encoding_for_model(TOKENIZER_MODEL)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        return load_encoding()
+    except Exception as e:      # Not cached yet and no network access
+        print(f"⚠️ Could not load the {TOKENIZER_MODEL} encoding from {TOKENIZER_CACHE_DIR}, "
+              f"falling back to estimated token counts (run `python context_budget.py` to fetch it): {e}")
+        return None
+
+
+def tokenizer_name() -> str:
+    return "tiktoken" if _encoding() is not None else "estimate"
+
+
+@lru_cache(maxsize=16384)
+def count_tokens(text: str) -> int:
+    """Tokens in `text` for TOKENIZER_MODEL, or an estimate of them without its encoding."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # About one token per 4 characters of a word, and one per symbol
+    return sum((len(piece) + 3) // 4 for piece in _WORD_PIECES.findall(text))
+
+
+@dataclass
+class ContextReport:
+    """Tokens spent per section of one budgeted context."""
+    budget: int
+    tokenizer: str
+    tokens: Dict[str, int] = field(default_factory=dict)
+    shown: Dict[str, int] = field(default_factory=dict)        # Items included, per item section
+    omitted: Dict[str, int] = field(default_factory=dict)      # Items left out, per item section
+    trimmed: List[str] = field(default_factory=list)           # Fixed sections cut to their required lines
+    over_budget: int = 0                                       # Tokens beyond the budget, if any
+
+    @property
+    def total(self) -> int:
+        return sum(self.tokens.values())
+
+
+@dataclass
+class _Item:
+    section: str
+    index: int              # Position in the section's original order
+    line: str
+    tier: int               # 0 = most urgent
+    severity: float = 0.0   # Tie-breaker within a tier, higher first
+
+
+def _fill_order(items: Dict[str, List[_Item]]) -> List[_Item]:
+    """All items, most urgent tier first; within a tier, sections take turns in ranked order.
+
+    Taking turns keeps one long section (e.g. 150 at-risk stories) from using up the
+    budget before any blocker or flagged member is shown.
+    """
+    keyed = []
+    for name, section_items in items.items():
+        priority = SECTION_PRIORITY.index(name)
+        ranks: Dict[int, int] = {}
+        for item in sorted(section_items, key=lambda item: (item.tier, -item.severity, item.index)):
+            rank = ranks[item.tier] = ranks.get(item.tier, -1) + 1
+            keyed.append(((item.tier, rank, priority), item))
+    keyed.sort(key=lambda entry: entry[0])
+    return [item for _, item in keyed]
+
+
+class BudgetedContextBuilder(SystemContextGenerator):
+    """System context that fits in `budget` tokens, most important items first."""
+
+    def __init__(self, budget: int = DEFAULT_CONTEXT_BUDGET):
+        super().__init__()
+        self.budget = budget
+        self.report: Optional[ContextReport] = None
+
+    def build(
+        self,
+        sprints: Sequence[SprintStatus],
+        daily_updates: Sequence[DailyUpdate],
+        analysis_results: Sequence[AnalysisResult],
+        correlation: dict,
+        workload_data: Sequence[WorkloadData],
+        forecast: Optional[SprintForecast] = None,
+        today: Optional[date] = None,
+        trends: Optional[TrendEngine] = None
+    ) -> str:
+        today = today or date.today()
+        self.report = ContextReport(self.budget, tokenizer_name())
+
+        if not sprints:
+            return "No sprint data available."
+
+        current = sprints[-1]
+        if forecast is None:
+            forecast = SprintForecaster.forecast(sprints, today)
+
+        sprint_results = [res for res in analysis_results if res.agent_type == "sprint"]
+        sprint_flags = [f for res in sprint_results for f in res.flags]
+        recommendations = [r for res in sprint_results for r in res.recommendations] + \
+            list(correlation["recommendations"])
+        member_risk = self._member_risk(analysis_results)
+
+        # Fixed sections, cached like the full context's
+        fixed = self._core_sections(sprints, correlation, forecast, trends)
+
+        items = {
+            "findings": [_Item("findings", i, f"- {flag}", 0) for i, flag in enumerate(sprint_flags)],
+            "recommendations": [_Item("recommendations", i, f"• {rec}", 0) for i, rec in enumerate(recommendations)],
+            "stories": self._story_items(current.user_stories, member_risk, today),
+            "daily_updates": self._update_items(daily_updates, member_risk),
+            "workload": self._workload_items(workload_data, member_risk, analysis_results),
+        }
+        summaries: Dict[str, Callable[[List[int]], str]] = {
+            "findings": lambda omitted: f"- {len(omitted)} more findings not shown",
+            "recommendations": lambda omitted: f"• {len(omitted)} more recommendations not shown",
+            "stories": lambda omitted: self._story_summary([current.user_stories[i] for i in omitted]),
+            "daily_updates": lambda omitted: self._update_summary([daily_updates[i] for i in omitted]),
+            "workload": lambda omitted: self._workload_summary([workload_data[i] for i in omitted]),
+        }
+
+        # Fixed text, item headings, section separators and a worst-case summary line
+        # per item section are paid for first; items share what is left
+        headings = {
+            "findings": "SPRINT HEALTH FINDINGS:",
+            "stories": "USER STORY DETAILS:",
+            "daily_updates": "DAILY TEAM UPDATES:",
+            "workload": "WORKLOAD SUMMARY:",
+            "recommendations": "KEY RECOMMENDATIONS:",
+        }
+        reserved = sum(count_tokens(heading) + 1 for heading in headings.values()) \
+            + (len(fixed) + len(headings) - 1)
+        for name, section_items in items.items():
+            if section_items:
+                reserved += count_tokens(summaries[name](list(range(len(section_items))))) + 1
+        self.report.trimmed.extend(self._trim_fixed(fixed, reserved))
+        remaining = self.budget - sum(count_tokens(text) for text in fixed.values()) - reserved
+
+        chosen = {name: set() for name in items}
+        for item in _fill_order(items):
+            cost = count_tokens(item.line) + 1
+            if cost <= remaining:
+                chosen[item.section].add(item.index)
+                remaining -= cost
+
+        empty = {
+            "findings": "- No major sprint-level risks detected",
+            "stories": "- No stories assigned for this sprint",
+            "daily_updates": "- No updates submitted today",
+            "workload": "- No workload data available",
+            "recommendations": "• No immediate actions required",
+        }
+        texts = {}
+        for name, section_items in items.items():
+            lines = [item.line for item in section_items if item.index in chosen[name]]
+            omitted = [item.index for item in section_items if item.index not in chosen[name]]
+            if omitted:
+                lines.append(summaries[name](omitted))
+            texts[name] = headings[name] + "\n" + ("\n".join(lines) if lines else empty[name])
+            self.report.shown[name] = len(section_items) - len(omitted)
+            self.report.omitted[name] = len(omitted)
+
+        order = ["header", "sprint_info", "trend", "forecast", "findings", "stories", "daily_updates",
+                 "workload", "team_health", "recommendations", "footer"]
+        sections = [fixed[name] if name in fixed else texts[name] for name in order]
+        for name, text in zip(order, sections):
+            self.report.tokens[name] = count_tokens(text)
+        context = "\n\n".join(sections)
+        self.report.over_budget = max(count_tokens(context) - self.budget, 0)
+        if self.report.over_budget:
+            print(f"⚠️ System context is {self.report.over_budget} tokens over its budget of {self.budget}: "
+                  f"the fixed sections alone don't fit")
+        return context
+
+    def core(
+        self,
+        sprints: Sequence[SprintStatus],
+        correlation: dict,
+        forecast: Optional[SprintForecast] = None,
+        today: Optional[date] = None,
+        trends: Optional[TrendEngine] = None
+    ) -> str:
+        """Fixed sections only, minus their optional lines while they don't fit in the budget."""
+        if not sprints:
+            return "No sprint data available."
+        if forecast is None:
+            forecast = SprintForecaster.forecast(sprints, today or date.today())
+        fixed = self._core_sections(sprints, correlation, forecast, trends)
+        self._trim_fixed(fixed, len(fixed) - 1)
+        return "\n\n".join(fixed.values())
+
+    def _trim_fixed(self, fixed: Dict[str, str], reserved: int) -> List[str]:
+        """Drop optional lines from `fixed` in FIXED_TRIM_ORDER until it fits next to
+        `reserved` tokens; returns the names of the trimmed sections."""
+        trimmed = []
+        for name, is_optional in FIXED_TRIM_ORDER:
+            if sum(count_tokens(text) for text in fixed.values()) + reserved <= self.budget:
+                break
+            lines = fixed[name].split("\n")
+            kept = [line for i, line in enumerate(lines) if not is_optional(i, line)]
+            if len(kept) < len(lines):
+                fixed[name] = "\n".join(kept)
+                trimmed.append(name)
+        return trimmed
+
+    # ==== Ranking ====
+
+    @staticmethod
+    def _member_risk(analysis_results: Sequence[AnalysisResult]) -> Dict[str, int]:
+        """Highest risk level (index into RISK_LEVELS) of each member's analyses."""
+        risk = {}
+        for result in analysis_results:
+            if result.agent_type != "sprint" and result.risk in RISK_LEVELS:
+                level = RISK_LEVELS.index(result.risk)
+                risk[result.member_id] = max(risk.get(result.member_id, 0), level)
+        return risk
+
+    @staticmethod
+    def _story_items(stories: Sequence[UserStory], member_risk: Dict[str, int], today: date) -> List[_Item]:
+        """Open stories that are stuck, overdue, unassigned or held by a flagged member first; done stories last."""
+        reference_day = today.toordinal()
+        columns = StoryColumns.of(stories)
+        start_day = columns.column("start_day")
+        started = start_day != MISSING_DAY
+        age = np.where(started, reference_day - start_day, 0)
+        points = columns.column("story_points")
+
+        stuck = columns.status_mask("in progress") & started & (age >= STUCK_DAYS)
+        overdue = (points != NO_POINTS) & started & (age > points)
+        flagged = [member for member, risk in member_risk.items() if risk > 0]
+        unowned_or_flagged = columns.assignee_mask(None, "", *flagged)
+        tiers = np.where(columns.status_mask(*DONE_STATUSES, ignore_case=True), 2,
+                         np.where(stuck | overdue | unowned_or_flagged, 0, 1))
+        return [
+            _Item("stories", i, SystemContextGenerator.story_line(us, reference_day), int(tiers[i]),
+                  int(age[i]) if tiers[i] != 2 else 0.0)
+            for i, us in enumerate(columns)
+        ]
+
+    @staticmethod
+    def _update_items(daily_updates: Sequence[DailyUpdate], member_risk: Dict[str, int]) -> List[_Item]:
+        """Updates with blockers or from flagged members first, most blockers first."""
+        items = []
+        for i, update in enumerate(daily_updates):
+            risk = member_risk.get(update.member_id, 0)
+            tier = 0 if update.blockers or risk > 0 else 1
+            items.append(_Item("daily_updates", i, SystemContextGenerator.update_line(update), tier,
+                               len(update.blockers) + risk))
+        return items
+
+    @staticmethod
+    def _workload_items(workload_data: Sequence[WorkloadData], member_risk: Dict[str, int],
+                        analysis_results: Sequence[AnalysisResult]) -> List[_Item]:
+        """Rows of flagged members first, highest risk and most flags first."""
+        flag_counts = {}
+        for result in analysis_results:
+            if result.agent_type != "sprint":
+                flag_counts[result.member_id] = flag_counts.get(result.member_id, 0) + len(result.flags)
+        items = []
+        for i, w in enumerate(workload_data):
+            risk = member_risk.get(w.member_id, 0)
+            items.append(_Item("workload", i, SystemContextGenerator.workload_line(w), 0 if risk > 0 else 1,
+                               risk * 100 + flag_counts.get(w.member_id, 0)))
+        return items
+
+    # ==== Summary lines ====
+
+    @staticmethod
+    def _story_summary(stories: Sequence[UserStory]) -> str:
+        statuses = {}
+        for us in stories:
+            statuses[us.status] = statuses.get(us.status, 0) + 1
+        breakdown = ", ".join(f"{count} {status}" for status, count in
+                              sorted(statuses.items(), key=lambda entry: (-entry[1], entry[0])))
+        points = sum(us.story_points or 0 for us in stories)
+        return f"- {len(stories)} more stories not shown ({breakdown}; {points} SP)"
+
+    @staticmethod
+    def _update_summary(daily_updates: Sequence[DailyUpdate]) -> str:
+        moods = {}
+        for update in daily_updates:
+            moods[update.mood] = moods.get(update.mood, 0) + 1
+        breakdown = ", ".join(f"{count} {mood}" for mood, count in
+                              sorted(moods.items(), key=lambda entry: (-entry[1], entry[0])))
+        blocked = sum(1 for update in daily_updates if update.blockers)
+        return f"- {len(daily_updates)} more updates not shown (moods: {breakdown}; {blocked} with blockers)"
+
+    @staticmethod
+    def _workload_summary(workload_data: Sequence[WorkloadData]) -> str:
+        active = sum(w.active_tasks for w in workload_data)
+        overtime = sum(w.overtime_hours for w in workload_data)
+        breaches = sum(w.sla_breaches for w in workload_data)
+        return (
+            f"- {len(workload_data)} more members not shown ({active} active tasks, "
+            f"{overtime}h overtime, {breaches} SLA breaches in total)"
+        )
+
+
+if __name__ == "__main__":
+    encoding = load_encoding()
+    print(f"✅ {encoding.name} encoding for {TOKENIZER_MODEL} cached in {TOKENIZER_CACHE_DIR}")
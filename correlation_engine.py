@@ -1,54 +1,86 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from typing import Any, Dict, List
-from data_models import AnalysisResult
+import numpy as np
+
+from data_models import AnalysisResult, Signal
+
+CORRELATION_KEYS = ["overloaded", "underutilized", "burnout", "critical", "recommendations"]
+
+
+@dataclass(frozen=True)
+class CorrelationRule:
+    """Members with every `requires` signal and no `excludes` signal get one entry per output.
+
+    Outputs are (correlation key, template); `{member}` in a template is the member id.
+    """
+    requires: Signal
+    outputs: Tuple[Tuple[str, str], ...]
+    excludes: Signal = Signal(0)
+
+
+CORRELATION_RULES = [
+    CorrelationRule(Signal.HIGH_TASK_LOAD | Signal.HIGH_STRESS, (
+        ("overloaded", "{member}"),
+        ("burnout", "{member}"),
+        ("critical", "{member}: High workload + stress"),
+        ("recommendations", "URGENT: Redistribute {member}'s workload"),
+    )),
+    CorrelationRule(Signal.HIGH_TASK_LOAD, (("overloaded", "{member}"),), excludes=Signal.HIGH_STRESS),
+    CorrelationRule(Signal.UNDERUTILIZED, (("underutilized", "{member}"),), excludes=Signal.HIGH_TASK_LOAD),
+    CorrelationRule(Signal.HIGH_STRESS, (
+        ("burnout", "{member}"),
+        ("recommendations", "Support {member} with 1:1 check-in"),
+    ), excludes=Signal.HIGH_TASK_LOAD),
+]
 
 
 class CorrelationEngine:
     @staticmethod
     def correlate(analyses: List[AnalysisResult]) -> Dict[str, Any]:
-        # Group analyses by member
-        grouped = {}
-        for analysis in analyses:
-            if analysis.member_id not in grouped:
-                grouped[analysis.member_id] = []
-            grouped[analysis.member_id].append(analysis)
-        
-        overloaded, underutilized, burnout, critical, recommendations = [], [], [], [], []
-        
-        for member_id, member_analyses in grouped.items():
-            # Check for specific conditions
-            high_load = any(
-                a.agent_type == "workload" and "High task load" in a.flags 
-                for a in member_analyses
-            )
-            high_stress = any(
-                a.agent_type == "wellbeing" and "High stress levels detected" in a.flags 
-                for a in member_analyses
-            )
-            underused = any(
-                a.agent_type == "workload" and "Underutilized capacity" in a.flags 
-                for a in member_analyses
-            )
-            
-            # Categorize members and generate recommendations
-            if high_load and high_stress:
-                overloaded.append(member_id)
-                burnout.append(member_id)
-                critical.append(f"{member_id}: High workload + stress")
-                recommendations.append(f"URGENT: Redistribute {member_id}'s workload")
-            elif high_load:
-                overloaded.append(member_id)
-            elif underused:
-                underutilized.append(member_id)
-            
-            if high_stress and not high_load:
-                burnout.append(member_id)
-                recommendations.append(f"Support {member_id} with 1:1 check-in")
-        
-        return {
-            "overloaded": overloaded,
-            "underutilized": underutilized,
-            "burnout": burnout,
-            "critical": critical,
-            "recommendations": recommendations
-        }
+        """Apply CORRELATION_RULES to the whole team."""
+        return CorrelationEngine.merge(CorrelationEngine.correlate_members(analyses).values())
+
+    @staticmethod
+    def correlate_members(analyses: Sequence[AnalysisResult],
+                          members: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, List[str]]]:
+        """Per-member correlation entries of `members` (everyone by default), in order of first analysis.
+
+        One pass over a member x signal bitmask; a member's entry depends on nothing but
+        that member's analyses, so entries can be reused while their analyses are unchanged.
+        """
+        # Combined signals per member, members in order of their first analysis
+        member_index: Dict[str, int] = {}
+        codes = np.fromiter(
+            (member_index.setdefault(a.member_id, len(member_index)) for a in analyses),
+            dtype=np.int64, count=len(analyses))
+        signals = np.fromiter((a.signals for a in analyses), dtype=np.int64, count=len(analyses))
+        member_signals = np.zeros(len(member_index), dtype=np.int64)
+        np.bitwise_or.at(member_signals, codes, signals)
+        member_ids = list(member_index)
+
+        wanted = np.ones(len(member_ids), dtype=bool)
+        if members is not None:
+            wanted[:] = False
+            wanted[[member_index[member] for member in members if member in member_index]] = True
+        entries = {member_ids[m]: {key: [] for key in CORRELATION_KEYS} for m in np.flatnonzero(wanted).tolist()}
+
+        # Rules in table order, so each member's lists follow the rule order
+        for rule in CORRELATION_RULES:
+            requires, excludes = int(rule.requires), int(rule.excludes)
+            matched = np.flatnonzero(
+                wanted & (member_signals & requires == requires) & (member_signals & excludes == 0)).tolist()
+            for member in matched:
+                entry = entries[member_ids[member]]
+                for key, template in rule.outputs:
+                    entry[key].append(template.format(member=member_ids[member]))
+        return entries
+
+    @staticmethod
+    def merge(member_correlations: Iterable[Dict[str, List[str]]]) -> Dict[str, Any]:
+        """Concatenate per-member correlations, in the given member order."""
+        merged = {key: [] for key in CORRELATION_KEYS}
+        for entry in member_correlations:
+            for key in CORRELATION_KEYS:
+                merged[key].extend(entry[key])
+        return merged
@@ -10,9 +10,15 @@ load_dotenv()
 
 # Access the API key from environment
 api_key = os.getenv("OPENAI_API_KEY")
+# Optional binary snapshot of Jira data, written by jira_agent.save_sprint_snapshot
+snapshot_path = os.getenv("PULSEBOARD_SNAPSHOT")
+# Optional SQLite database to keep team history in instead of memory
+db_path = os.getenv("PULSEBOARD_DB")
+# Seconds between background Jira refreshes; unset keeps the data static
+refresh_interval = float(os.getenv("PULSEBOARD_REFRESH_INTERVAL", "0")) or None
 
 def create_interface():
-    ai_manager = AIManager()
+    ai_manager = AIManager(snapshot_path=snapshot_path, db_path=db_path, refresh_interval=refresh_interval)
     
     def respond(message: str, history: List):
         # Update API key if changed
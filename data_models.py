@@ -1,7 +1,49 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from enum import IntFlag
+from functools import lru_cache
+from datetime import date
+from typing import List, Optional, Sequence
 # ==== Data Models ====
 
+# Story statuses that count as finished
+DONE_STATUSES = {"done", "completed", "closed"}
+
+MISSING_DAY = -1         # Day-ordinal sentinel for a missing or unparseable date
+
+
+@lru_cache(maxsize=4096)
+def date_to_ordinal(value: Optional[str]) -> int:
+    """'YYYY-MM-DD' (optionally followed by a time) as a day ordinal, or MISSING_DAY."""
+    if not value:
+        return MISSING_DAY
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except ValueError:
+        return MISSING_DAY
+
+
+def ordinal_to_date(day: int) -> str:
+    return date.fromordinal(day).isoformat() if day != MISSING_DAY else ""
+
+
+class Signal(IntFlag):
+    """Interned code for each per-member flag, so results can be matched with bit operations."""
+    # Workload
+    HIGH_TASK_LOAD = 1 << 0
+    EXCESSIVE_OVERTIME = 1 << 1
+    SLA_VIOLATIONS = 1 << 2
+    UNDERUTILIZED = 1 << 3
+    # Goals
+    LOW_COMPLETION = 1 << 4
+    BEHIND_VELOCITY = 1 << 5
+    EXCEEDING_GOALS = 1 << 6
+    # Wellbeing
+    HIGH_STRESS = 1 << 7
+    MULTIPLE_BLOCKERS = 1 << 8
+    EXTENDED_HOURS = 1 << 9
+    NEGATIVE_SENTIMENT = 1 << 10
+
+
 @dataclass
 class DailyUpdate:
     member_id: str
@@ -11,6 +53,11 @@ class DailyUpdate:
     achievements: List[str]
     comments: str
     working_hours: int
+    # `date` as a day ordinal, parsed once here (MISSING_DAY if absent or invalid)
+    day: int = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        self.day = date_to_ordinal(self.date)
 
 @dataclass
 class WorkloadData:
@@ -38,6 +85,7 @@ class AnalysisResult:
     risk: str
     flags: List[str]
     recommendations: List[str]
+    signals: Signal = Signal(0)  # The flags above that have a Signal code
 
 @dataclass
 class UserStory:
@@ -48,6 +96,11 @@ class UserStory:
     status: str                  # e.g., "in progress", "done", "unassigned"
     story_points: Optional[int] = None
     tags: Optional[List[str]] = None
+    # `start_date` as a day ordinal, parsed once here (MISSING_DAY if absent or invalid)
+    start_day: int = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        self.start_day = date_to_ordinal(self.start_date)
 
 @dataclass
 class SprintStatus:
@@ -60,7 +113,14 @@ class SprintStatus:
     unassigned_stories: int
     velocity: int                # Completed story points
     planned_velocity: int
-    user_stories: List[UserStory]
+    user_stories: Sequence[UserStory]    # A list, or a columnar.StoryColumns once published to a DataStore
+    # Sprint dates as day ordinals, parsed once here (MISSING_DAY if absent or invalid)
+    start_day: int = field(init=False, compare=False, repr=False)
+    end_day: int = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        self.start_day = date_to_ordinal(self.start_date)
+        self.end_day = date_to_ordinal(self.end_date)
 
 
 @dataclass
@@ -1,10 +1,99 @@
 
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from columnar import StoryColumns, UpdateColumns
 from data_models import DailyUpdate, GoalData, SprintStatus, UserStory, WorkloadData
+from snapshots import SnapshotReader
+from storage_backends import InMemoryBackend, StorageBackend
+
+
+CHANGE_LOG_SIZE = 64     # Publishes remembered by changes_since()
+HISTORY_SPRINTS = 12     # Sprints loaded from the backend; older ones stay behind the indexed queries
+UPDATE_DAYS = 14         # Days of daily updates loaded from the backend
+
+
+@dataclass
+class ChangeSet:
+    """Members and sprints whose data differs between two data versions."""
+    members: Set[str] = field(default_factory=set)
+    sprints: Set[str] = field(default_factory=set)
+
+    def update(self, other: "ChangeSet"):
+        self.members |= other.members
+        self.sprints |= other.sprints
+
+    def __bool__(self) -> bool:
+        return bool(self.members or self.sprints)
+
+
+def _changed_keys(old_rows: Sequence, new_rows: Sequence, key: str) -> Set[str]:
+    """Keys whose rows (compared in order) differ between two versions of a collection."""
+    if old_rows is new_rows:
+        return set()
+    old, new = {}, {}
+    for rows, grouped in ((old_rows, old), (new_rows, new)):
+        for row in rows:
+            grouped.setdefault(getattr(row, key), []).append(row)
+    return {value for value in old.keys() | new.keys() if old.get(value) != new.get(value)}
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """One consistent, never-modified version of every collection.
+
+    Readers take a reference once per request and keep using it, so a refresh that
+    publishes a newer snapshot never shows them half-updated data. Each sprint's stories
+    are held as a StoryColumns store.
+    """
+    version: int
+    created_at: float
+    sprints: Tuple[SprintStatus, ...]
+    daily_updates: Tuple[DailyUpdate, ...]
+    workload_data: Tuple[WorkloadData, ...]
+    goal_data: Tuple[GoalData, ...]
+    # Derived views, built at most once per snapshot
+    _derived: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def age(self) -> float:
+        """Seconds since this snapshot was published."""
+        return time.time() - self.created_at
+
+    def update_columns(self) -> UpdateColumns:
+        """Columnar view of the daily updates."""
+        if "update_columns" not in self._derived:
+            self._derived["update_columns"] = UpdateColumns(self.daily_updates)
+        return self._derived["update_columns"]
 
 
 class DataStore:
-    def __init__(self):
-        self.daily_updates = [
+    def __init__(self, snapshot_path: Optional[str] = None, backend: Optional[StorageBackend] = None,
+                 history_sprints: Optional[int] = HISTORY_SPRINTS, update_days: Optional[int] = UPDATE_DAYS):
+        """Load the collections from `backend` (sample data in memory by default).
+
+        Only the last `history_sprints` sprints and `update_days` days of daily updates
+        are loaded (None loads everything); the rest of the history is reached through
+        the indexed queries. Collections found in the snapshot file are written into the
+        backend first.
+        """
+        self.backend = backend if backend is not None else InMemoryBackend(*self._sample_data())
+        self.history_sprints = history_sprints
+        self.update_days = update_days
+        self._snapshot: Optional[DataSnapshot] = None
+        self._publish_lock = threading.Lock()
+        self._change_log = deque(maxlen=CHANGE_LOG_SIZE)   # (version, ChangeSet since the version before)
+        if snapshot_path:
+            self.load_snapshot(snapshot_path)
+        else:
+            self.reload()
+
+    @staticmethod
+    def _sample_data():
+        daily_updates = [
             DailyUpdate("alice", "2025-06-28", "stressed", 
                        ["API integration issues", "Database migration"],
                        ["Fixed critical bug #458"],
@@ -18,21 +107,21 @@ class DataStore:
                        "Making good progress on user stories", 8)
         ]
         
-        self.workload_data = [
+        workload_data = [
             WorkloadData("alice", 12, 8, 2, 15, 25, 8),
             WorkloadData("bob", 3, 5, 0, 2, 8, 3),
             WorkloadData("charlie", 7, 9, 1, 5, 18, 6)
         ]
         
-        self.goal_data = [
+        goal_data = [
             GoalData("alice", 10, 6, 0.6, 32, 0.8),
             GoalData("bob", 6, 4, 0.67, 15, 0.7),
             GoalData("charlie", 8, 7, 0.875, 24, 0.85)
         ]
 
-        # self.sprints = fetch_all_sprint_statuses()
+        # sprints = fetch_all_sprint_statuses()
         
-        self.sprints = [
+        sprints = [
              # Sprint 40 - before last
             SprintStatus(
                 sprint_name="Sprint 40 - Griffin",
@@ -89,3 +178,156 @@ class DataStore:
             )
         ]
 
+        return sprints, daily_updates, workload_data, goal_data
+
+    # ==== Snapshot Access ====
+
+    @property
+    def snapshot(self) -> DataSnapshot:
+        """The current data version; take it once and use it for the whole request."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def age(self) -> float:
+        """Seconds since the current data version was published."""
+        return self._snapshot.age
+
+    @property
+    def sprints(self) -> Tuple[SprintStatus, ...]:
+        return self._snapshot.sprints
+
+    @property
+    def daily_updates(self) -> Tuple[DailyUpdate, ...]:
+        return self._snapshot.daily_updates
+
+    @property
+    def workload_data(self) -> Tuple[WorkloadData, ...]:
+        return self._snapshot.workload_data
+
+    @property
+    def goal_data(self) -> Tuple[GoalData, ...]:
+        return self._snapshot.goal_data
+
+    def update_columns(self) -> UpdateColumns:
+        return self._snapshot.update_columns()
+
+    # ==== Updates ====
+
+    def publish(
+        self,
+        sprints: Optional[Sequence[SprintStatus]] = None,
+        daily_updates: Optional[Sequence[DailyUpdate]] = None,
+        workload_data: Optional[Sequence[WorkloadData]] = None,
+        goal_data: Optional[Sequence[GoalData]] = None,
+        persist: bool = True
+    ) -> DataSnapshot:
+        """Build a new snapshot (collections left as None are carried over) and swap it in atomically."""
+        if sprints is not None:
+            # The backend is given the columnar sprints too, so an in-memory one shares them
+            sprints = tuple(map(self._columnar, sprints))
+        with self._publish_lock:
+            current = self._snapshot
+            if persist:
+                if sprints is not None:
+                    self.backend.save_sprints(list(sprints))
+                if daily_updates is not None:
+                    self.backend.save_daily_updates(list(daily_updates))
+                if workload_data is not None:
+                    self.backend.save_workload_data(list(workload_data))
+                if goal_data is not None:
+                    self.backend.save_goal_data(list(goal_data))
+
+            snapshot = DataSnapshot(
+                version=current.version + 1 if current else 1,
+                created_at=time.time(),
+                sprints=sprints if sprints is not None else current.sprints,
+                daily_updates=tuple(daily_updates) if daily_updates is not None else current.daily_updates,
+                workload_data=tuple(workload_data) if workload_data is not None else current.workload_data,
+                goal_data=tuple(goal_data) if goal_data is not None else current.goal_data
+            )
+            if current is not None:
+                self._change_log.append((snapshot.version, self._diff(current, snapshot)))
+            # A single reference assignment: readers see either the old or the new snapshot
+            self._snapshot = snapshot
+            return snapshot
+
+    @staticmethod
+    def _columnar(sprint: SprintStatus) -> SprintStatus:
+        """The sprint with its stories held as columns (a sprint already published is reused as is)."""
+        if isinstance(sprint.user_stories, StoryColumns):
+            return sprint
+        return replace(sprint, user_stories=StoryColumns(sprint.user_stories))
+
+    @staticmethod
+    def _diff(old: DataSnapshot, new: DataSnapshot) -> ChangeSet:
+        members = set()
+        for collection in ("daily_updates", "workload_data", "goal_data"):
+            members |= _changed_keys(getattr(old, collection), getattr(new, collection), "member_id")
+        return ChangeSet(members, _changed_keys(old.sprints, new.sprints, "sprint_name"))
+
+    def changes_since(self, since: int, until: Optional[int] = None) -> Optional[ChangeSet]:
+        """Everything that changed after version `since` up to `until` (the current version by default).
+
+        Returns None when the change log no longer reaches back to `since`.
+        """
+        with self._publish_lock:
+            until = until if until is not None else self._snapshot.version
+            entries = [changes for version, changes in self._change_log if since < version <= until]
+        if len(entries) != until - since:
+            return None
+        combined = ChangeSet()
+        for changes in entries:
+            combined.update(changes)
+        return combined
+
+    def reload(self) -> DataSnapshot:
+        """Re-read the recent sprints and updates and the current workload and goals from the backend."""
+        return self.publish(**{name: self._load(name) for name in
+                               ("sprints", "daily_updates", "workload_data", "goal_data")}, persist=False)
+
+    def _load(self, name: str) -> list:
+        if name == "sprints":
+            return self.backend.load_sprints(self.history_sprints)
+        if name == "daily_updates":
+            return self.backend.load_daily_updates(self.update_days)
+        return getattr(self.backend, f"load_{name}")()
+
+    def load_snapshot(self, path: str) -> DataSnapshot:
+        """Publish the collections of a snapshot file and store them in the backend.
+
+        Each section in the file is decoded once and published as is, instead of being
+        read back from the backend. Absent sections keep their current data (or are
+        loaded from the backend when there is none yet).
+        """
+        with SnapshotReader(path) as reader:
+            collections = {
+                "sprints": reader.sprints,
+                "daily_updates": reader.daily_updates,
+                "workload_data": reader.workload_data,
+                "goal_data": reader.goal_data,
+            }
+        if collections["sprints"] is not None:
+            collections["sprints"] = [self._columnar(sprint) for sprint in collections["sprints"]]
+        for name, rows in collections.items():
+            if rows is not None:
+                getattr(self.backend, f"save_{name}")(rows)
+            elif self._snapshot is None:
+                collections[name] = self._load(name)
+        return self.publish(**collections, persist=False)
+
+    # ==== Indexed Queries ====
+    # These cover the backend's full history, not just what the snapshot holds.
+
+    def stories_by_assignee(self, assignee: str) -> List[UserStory]:
+        return self.backend.stories_by_assignee(assignee)
+
+    def updates_by_member(self, member_id: str, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> List[DailyUpdate]:
+        return self.backend.updates_by_member(member_id, start_date, end_date)
+
+    def open_stories(self, sprint_name: str) -> List[UserStory]:
+        return self.backend.open_stories(sprint_name)
@@ -1,6 +1,6 @@
 
 from typing import List
-from data_models import AnalysisResult, GoalData
+from data_models import AnalysisResult, GoalData, Signal
 
 
 class GoalAnalyzer:
@@ -10,17 +10,20 @@ class GoalAnalyzer:
         for data in goal_data:
             flags, recommendations = [], []
             risk = "low"
+            signals = Signal(0)
             completion_rate = data.completed_goals / data.sprint_goals
             
             # Low completion rate
             if completion_rate < 0.5:
                 flags.append("Low sprint completion rate")
+                signals |= Signal.LOW_COMPLETION
                 recommendations.append("Review sprint commitments")
                 risk = "high"
             
             # Velocity behind expected
             if data.velocity < data.expected_completion:
                 flags.append("Behind velocity")
+                signals |= Signal.BEHIND_VELOCITY
                 recommendations.append("Assess task complexity")
                 if risk != "high":
                     risk = "medium"
@@ -28,9 +31,10 @@ class GoalAnalyzer:
             # Exceeding goals
             if completion_rate > 0.9:
                 flags.append("Exceeding goals")
+                signals |= Signal.EXCEEDING_GOALS
                 recommendations.append("Increase sprint capacity")
             
-            results.append(AnalysisResult("goal", data.member_id, risk, flags, recommendations))
+            results.append(AnalysisResult("goal", data.member_id, risk, flags, recommendations, signals))
         
         return results
 
@@ -1,176 +1,248 @@
 import os
+import random
+import re
+import threading
+import time
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Tuple
 from dotenv import load_dotenv
-from datetime import datetime
-import sys
+from datetime import datetime, timezone
 from urllib.parse import quote
 
-from data_models import Sprint, SprintStatus, UserStory
-
-load_dotenv()
+from data_models import DONE_STATUSES, Sprint, SprintStatus, UserStory
+from jira_cache import BoardIdCache, CacheEntry, JiraResponseCache
+from snapshots import write_snapshot
 
 # ==== Jira Auth & Config ====
-JIRA_BASE_URL = os.getenv("JIRA_BASE_URL")
-JIRA_EMAIL = os.getenv("JIRA_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_BOARD_ID = os.getenv("JIRA_BOARD_ID")
-
-# Validate required environment variables
-required_vars = ["JIRA_BASE_URL", "JIRA_EMAIL", "JIRA_API_TOKEN", "JIRA_BOARD_ID"]
-missing_vars = [var for var in required_vars if not os.getenv(var)]
-
-if missing_vars:
-    print(f"Error: Missing required environment variables: {', '.join(missing_vars)}")
-    sys.exit(1)
-
-# Clean up the base URL
-JIRA_BASE_URL = JIRA_BASE_URL.rstrip('/')
-if '//' in JIRA_BASE_URL.replace('https://', '').replace('http://', ''):
-    JIRA_BASE_URL = JIRA_BASE_URL.replace('//', '/')
-
-auth = (JIRA_EMAIL, JIRA_API_TOKEN)
-headers = {
-    "Accept": "application/json",
-    "Content-Type": "application/json"
-}
 
-# ==== Jira API Functions ====
+REQUIRED_ENV_VARS = ["JIRA_BASE_URL", "JIRA_EMAIL", "JIRA_API_TOKEN", "JIRA_BOARD_ID"]
+
+# Status codes Jira uses for throttling and transient gateway failures
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+# Status codes that mean the requested resource is gone, so its cached response is dropped
+GONE_STATUS_CODES = {404, 410}
+
+# Issue fields that have the same id on every Jira site
+BASE_ISSUE_FIELDS = ["summary", "assignee", "status", "labels", "created", "issuetype"]
+# Story-points candidates probed when the field metadata cannot be read
+DEFAULT_STORY_POINTS_FIELDS = ["customfield_10016", "customfield_10004", "storyPoints", "customfield_10002"]
+STORY_POINTS_FIELD_NAMES = {"story points", "story point estimate"}
+FIELD_METADATA_TTL = 24 * 3600.0
+FIELD_METADATA_RETRY = 60.0     # Seconds the default field map stands in after a failed metadata request
+SPRINT_FIELD_SCHEMA_SUFFIX = ":gh-sprint"
+# Older Jira servers serialise sprint field values as "...Sprint@1a2b[id=12,rapidViewId=3,...]"
+LEGACY_SPRINT_ID_PATTERN = re.compile(r"\bid=(\d+)")
+
+# Cache TTL for data that never changes, such as the issues of a closed sprint
+CACHE_FOREVER = float("inf")
+
+
+class JiraConfigError(ValueError):
+    """Raised when the Jira configuration is missing or invalid."""
+
 
-def make_jira_request(url: str, retry_count: int = 2) -> Optional[Dict[str, Any]]:
-    """Make a request to Jira API with error handling and retry logic."""
-    for attempt in range(retry_count + 1):
+@dataclass
+class JiraConfig:
+    base_url: str
+    email: str
+    api_token: str
+    board_id: str                # Numeric id or board name
+    max_workers: int = 4         # Concurrent sprint and page fetches
+    pool_size: int = 10          # Keep-alive connections held open to Jira
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0       # Cap of our own jittered backoff
+    rate_limit_max: float = 600.0    # Cap of a wait Jira asks for with Retry-After or X-RateLimit-Reset
+    cache_dir: str = ".jira_cache"   # Empty string disables the response cache
+    cache_ttl: float = 60.0          # Seconds before open data is revalidated
+    full_sync_interval: float = 3600.0   # Seconds between full re-downloads in delta mode
+
+    def __post_init__(self):
+        missing = [name for name in ("base_url", "email", "api_token", "board_id") if not getattr(self, name)]
+        if missing:
+            raise JiraConfigError(f"Missing required Jira settings: {', '.join(missing)}")
+
+        # Clean up the base URL
+        self.base_url = self.base_url.rstrip('/')
+        if '//' in self.base_url.replace('https://', '').replace('http://', ''):
+            self.base_url = self.base_url.replace('//', '/')
+        self.board_id = str(self.board_id)
+
+    @classmethod
+    def from_env(cls, **overrides) -> "JiraConfig":
+        """Build a config from the environment (and .env file); keyword arguments take precedence."""
+        load_dotenv()
         try:
-            print(f"Making request to: {url} (attempt {attempt + 1})")
-            response = requests.get(url, headers=headers, auth=auth, timeout=60)  # Increased timeout
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.Timeout as e:
-            print(f"Timeout on attempt {attempt + 1}: {e}")
-            if attempt < retry_count:
-                print("Retrying...")
-                continue
-            else:
-                print("Max retries reached. Continuing with partial data...")
-                return None
-        except requests.exceptions.RequestException as e:
-            print(f"Error making request to {url}: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response status: {e.response.status_code}")
-                print(f"Response content: {e.response.text}")
-            return None
+            settings = dict(
+                base_url=os.getenv("JIRA_BASE_URL"),
+                email=os.getenv("JIRA_EMAIL"),
+                api_token=os.getenv("JIRA_API_TOKEN"),
+                board_id=os.getenv("JIRA_BOARD_ID"),
+                max_workers=int(os.getenv("JIRA_MAX_WORKERS", "4")),
+                pool_size=int(os.getenv("JIRA_POOL_SIZE", "10")),
+                backoff_base=float(os.getenv("JIRA_BACKOFF_BASE", "1.0")),
+                backoff_max=float(os.getenv("JIRA_BACKOFF_MAX", "30.0")),
+                rate_limit_max=float(os.getenv("JIRA_RATE_LIMIT_MAX", "600.0")),
+                cache_dir=os.getenv("JIRA_CACHE_DIR", ".jira_cache"),
+                cache_ttl=float(os.getenv("JIRA_CACHE_TTL", "60")),
+                full_sync_interval=float(os.getenv("JIRA_FULL_SYNC_INTERVAL", "3600")),
+            )
         except ValueError as e:
-            print(f"Error parsing JSON response: {e}")
-            return None
-    
-    return None
+            raise JiraConfigError(f"Invalid numeric Jira setting: {e}") from e
+        settings.update(overrides)
 
-def get_board_id_by_name(board_name: str) -> Optional[int]:
-    """Get board ID by board name."""
-    url = f"{JIRA_BASE_URL}/rest/agile/1.0/board"
-    
-    data = make_jira_request(url)
-    if not data:
-        return None
-    
-    boards = data.get("values", [])
-    for board in boards:
-        if board.get("name") == board_name:
-            return board.get("id")
-    
-    print(f"Board '{board_name}' not found.")
-    return None
+        missing_vars = [var for var in REQUIRED_ENV_VARS if not settings[var[len("JIRA_"):].lower()]]
+        if missing_vars:
+            raise JiraConfigError(f"Missing required environment variables: {', '.join(missing_vars)}")
+        return cls(**settings)
 
-def get_active_sprint() -> Optional[Sprint]:
-    """Fetch the active sprint from the specified board."""
-    try:
-        board_id = int(JIRA_BOARD_ID)
-    except ValueError:
-        print(f"Board identifier '{JIRA_BOARD_ID}' is not numeric. Looking up board ID...")
-        board_id = get_board_id_by_name(JIRA_BOARD_ID)
-        if not board_id:
-            return None
-    
-    url = f"{JIRA_BASE_URL}/rest/agile/1.0/board/{board_id}/sprint?state=active"
-    
-    data = make_jira_request(url)
-    if not data:
-        return None
-    
-    sprints = data.get("values", [])
-    if not sprints:
-        print("No active sprints found.")
-        return None
-    
-    sprint_data = sprints[0]
-    
-    return Sprint(
-        id=sprint_data.get("id"),
-        name=sprint_data.get("name"),
-        state=sprint_data.get("state"),
-        start_date=sprint_data.get("startDate"),
-        end_date=sprint_data.get("endDate"),
-        complete_date=sprint_data.get("completeDate"),
-        board_id=sprint_data.get("originBoardId"),
-        goal=sprint_data.get("goal", "")
-    )
 
-def get_sprint_issues(sprint_id: int, max_issues: int = 100) -> List[Dict[str, Any]]:
-    """Get all issues in a sprint with improved error handling."""
-    url = f"{JIRA_BASE_URL}/rest/agile/1.0/sprint/{sprint_id}/issue"
-    
-    all_issues = []
-    start_at = 0
-    max_results = 50
-    
-    while start_at < max_issues:  # Limit total requests to avoid timeouts
-        paginated_url = f"{url}?startAt={start_at}&maxResults={max_results}&fields=summary,assignee,status,customfield_10016,labels,created,issuetype,priority"
-        
-        data = make_jira_request(paginated_url)
-        if not data:
-            print(f"Failed to fetch issues starting at {start_at}. Using partial data...")
-            break
-        
-        issues = data.get("issues", [])
-        if not issues:
-            print("No more issues found.")
-            break
-        
-        all_issues.extend(issues)
-        print(f"Fetched {len(all_issues)} issues so far...")
-        
-        # Check if there are more results
-        if len(issues) < max_results:
-            print("Reached end of issues.")
-            break
-        
-        start_at += max_results
-    
-    return all_issues
+@dataclass
+class IssueFieldMap:
+    story_points: List[str]      # Candidate field ids, most specific first
+    priority: Optional[str] = "priority"
+    sprint: Optional[str] = None
 
-def extract_story_points(issue: Dict[str, Any]) -> Optional[int]:
-    """Extract story points from issue (customfield_10016 is common for story points)."""
-    fields = issue.get("fields", {})
-    
-    # Common story points fields - adjust these based on your Jira configuration
-    story_points_fields = [
-        "customfield_10016",  # Common story points field
-        "customfield_10004",  # Alternative story points field
-        "storyPoints",
-        "customfield_10002"
-    ]
-    
-    for field in story_points_fields:
-        if field in fields and fields[field] is not None:
+    @property
+    def fields_param(self) -> str:
+        """Comma-separated `fields` query value requesting exactly the fields we parse."""
+        extra = self.story_points + ([self.priority] if self.priority else [])
+        return ",".join(BASE_ISSUE_FIELDS + extra)
+
+    @property
+    def fields_param_with_sprint(self) -> str:
+        """Like `fields_param`, plus the sprint field used to split bulk search results."""
+        return f"{self.fields_param},{self.sprint}" if self.sprint else self.fields_param
+
+DEFAULT_FIELD_MAP = IssueFieldMap(story_points=DEFAULT_STORY_POINTS_FIELDS)
+
+
+@dataclass
+class SprintSyncState:
+    sprint_status: SprintStatus
+    last_sync: float             # Epoch seconds when the last successful sync started
+    last_full_sync: float
+
+# ==== Jira Helpers ====
+
+def _conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+    """Revalidation headers for a stale cache entry."""
+    if entry is None:
+        return {}
+    conditional = {}
+    if entry.etag:
+        conditional["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        conditional["If-Modified-Since"] = entry.last_modified
+    return conditional
+
+def _is_transient_status(status_code: int) -> bool:
+    """Throttling and server-side failures, which are worth retrying or riding out."""
+    return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+
+def _backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def _rate_limit_delay(response: requests.Response) -> Optional[float]:
+    """Seconds to wait according to Retry-After or Jira's rate-limit reset header."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
             try:
-                return int(float(fields[field]))
-            except (ValueError, TypeError):
-                continue
-    
+                reset_at = parsedate_to_datetime(retry_after)
+                return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    # Jira Cloud reports the end of the current rate-limit window as an ISO timestamp
+    reset = response.headers.get("X-RateLimit-Reset")
+    if reset:
+        try:
+            reset_at = datetime.fromisoformat(reset.replace("Z", "+00:00"))
+            if reset_at.tzinfo is None:
+                reset_at = reset_at.replace(tzinfo=timezone.utc)
+            return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+        except ValueError:
+            pass
+
     return None
 
-def parse_user_story(issue: Dict[str, Any]) -> UserStory:
+def resolve_field_map(field_metadata: List[Dict[str, Any]]) -> IssueFieldMap:
+    """Pick the story-points and priority field ids out of /rest/api/2/field metadata."""
+    by_name, by_schema = [], []
+    priority = None
+    sprint = None
+    for meta in field_metadata:
+        schema = meta.get("schema") or {}
+        if schema.get("system") == "priority":
+            priority = meta.get("id")
+        elif schema.get("custom", "").endswith(SPRINT_FIELD_SCHEMA_SUFFIX):
+            sprint = meta.get("id")
+        elif (meta.get("name") or "").strip().lower() in STORY_POINTS_FIELD_NAMES:
+            # Team-managed "Story point estimate" and company-managed "Story Points"
+            by_name.append(meta.get("id"))
+        elif schema.get("custom", "").endswith(":jsw-story-points"):
+            by_schema.append(meta.get("id"))
+
+    story_points = by_name + by_schema
+    if not story_points:
+        print("No story points field found in Jira field metadata. Using default candidates...")
+        story_points = list(DEFAULT_STORY_POINTS_FIELDS)
+    return IssueFieldMap(story_points=story_points, priority=priority, sprint=sprint)
+
+def issue_sprint_ids(issue: Dict[str, Any], sprint_field: str) -> List[int]:
+    """Ids of every sprint an issue has been in, read from the sprint custom field."""
+    sprint_ids = []
+    for value in issue.get("fields", {}).get(sprint_field) or []:
+        if isinstance(value, dict):
+            if value.get("id") is not None:
+                sprint_ids.append(int(value["id"]))
+        elif isinstance(value, str):
+            match = LEGACY_SPRINT_ID_PATTERN.search(value)
+            if match:
+                sprint_ids.append(int(match.group(1)))
+    return sprint_ids
+
+def make_story_points_extractor(field_ids: List[str]) -> Callable[[Dict[str, Any]], Optional[int]]:
+    """Build an extractor that only looks at the given story-points field ids."""
+    def to_points(value: Any) -> Optional[int]:
+        try:
+            return int(float(value))
+        except (ValueError, TypeError):
+            return None
+
+    if len(field_ids) == 1:
+        field_id = field_ids[0]
+
+        def extract_single(issue: Dict[str, Any]) -> Optional[int]:
+            value = issue.get("fields", {}).get(field_id)
+            return to_points(value) if value is not None else None
+        return extract_single
+
+    def extract_first(issue: Dict[str, Any]) -> Optional[int]:
+        fields = issue.get("fields", {})
+        for field_id in field_ids:
+            value = fields.get(field_id)
+            if value is not None:
+                points = to_points(value)
+                if points is not None:
+                    return points
+        return None
+    return extract_first
+
+# Common story points fields - adjust these based on your Jira configuration
+extract_story_points = make_story_points_extractor(DEFAULT_STORY_POINTS_FIELDS)
+extract_story_points.__doc__ = "Extract story points from issue by probing the common story points fields."
+
+def parse_user_story(issue: Dict[str, Any],
+                     story_points_extractor: Callable[[Dict[str, Any]], Optional[int]] = extract_story_points) -> UserStory:
     """Parse Jira issue into UserStory format."""
     fields = issue.get("fields", {})
     
@@ -195,32 +267,40 @@ def parse_user_story(issue: Dict[str, Any]) -> UserStory:
         assignee=assignee,
         start_date=start_date,
         status=status,
-        story_points=extract_story_points(issue),
+        story_points=story_points_extractor(issue),
         tags=labels if labels else None
     )
 
-def calculate_sprint_metrics(user_stories: List[UserStory], sprint: Sprint) -> Dict[str, int]:
-    """Calculate sprint metrics from user stories."""
-    total_stories = len(user_stories)
-    completed_stories = len([s for s in user_stories if s.status.lower() in ["done", "completed", "closed"]])
-    unassigned_stories = len([s for s in user_stories if s.assignee.lower() == "unassigned"])
-    
-    # Calculate story points
-    total_story_points = sum(story.story_points for story in user_stories if story.story_points)
-    completed_story_points = sum(
-        story.story_points for story in user_stories 
-        if story.story_points and story.status.lower() in ["done", "completed", "closed"]
-    )
+def calculate_sprint_metrics(user_stories: Iterable[UserStory], sprint: Sprint) -> Dict[str, int]:
+    """Calculate sprint metrics from user stories in a single pass, so a stream works too."""
+    total_stories = 0
+    completed_stories = 0
+    unassigned_stories = 0
+    total_story_points = 0
+    completed_story_points = 0
+    critical_bugs = 0
+
+    for story in user_stories:
+        total_stories += 1
+        done = story.status.lower() in DONE_STATUSES
+        if done:
+            completed_stories += 1
+        if story.assignee.lower() == "unassigned":
+            unassigned_stories += 1
+
+        # Calculate story points
+        if story.story_points:
+            total_story_points += story.story_points
+            if done:
+                completed_story_points += story.story_points
+
+        # Count critical bugs (issues with high/highest priority and bug type)
+        if any(tag and ("bug" in tag.lower() or "critical" in tag.lower()) for tag in (story.tags or [])):
+            critical_bugs += 1
     
     # Calculate completion percentage
     completion = int((completed_stories / total_stories * 100)) if total_stories > 0 else 0
     
-    # Count critical bugs (issues with high/highest priority and bug type)
-    critical_bugs = len([
-        s for s in user_stories 
-        if any(tag and ("bug" in tag.lower() or "critical" in tag.lower()) for tag in (s.tags or []))
-    ])
-    
     return {
         "completion": completion,
         "target": 80,  # Default target, adjust as needed
@@ -230,33 +310,11 @@ def calculate_sprint_metrics(user_stories: List[UserStory], sprint: Sprint) -> D
         "planned_velocity": total_story_points
     }
 
-def get_sprint_status() -> Optional[SprintStatus]:
-    """Get complete sprint status with all user stories and metrics."""
-    
-    # Get active sprint
-    sprint = get_active_sprint()
-    if not sprint:
-        print("No active sprint found.")
-        return None
-    
-    print(f"Found active sprint: {sprint.name}")
-    
-    # Get all issues in the sprint
-    sprint_issues = get_sprint_issues(sprint.id)
-    if not sprint_issues:
-        print("No issues found in sprint.")
-        return None
-    
-    print(f"Found {len(sprint_issues)} issues in sprint")
-    
-    # Parse issues into UserStory objects
-    user_stories = [parse_user_story(issue) for issue in sprint_issues]
-    
-    # Calculate metrics
+def build_sprint_status(sprint: Sprint, user_stories: List[UserStory]) -> SprintStatus:
+    """Create a SprintStatus for a sprint from its parsed user stories."""
     metrics = calculate_sprint_metrics(user_stories, sprint)
-    
-    # Create SprintStatus object
-    sprint_status = SprintStatus(
+
+    return SprintStatus(
         sprint_name=sprint.name,
         start_date=sprint.start_date.split("T")[0] if sprint.start_date else "",
         end_date=sprint.end_date.split("T")[0] if sprint.end_date else "",
@@ -268,8 +326,627 @@ def get_sprint_status() -> Optional[SprintStatus]:
         planned_velocity=metrics["planned_velocity"],
         user_stories=user_stories
     )
-    
-    return sprint_status
+
+# ==== Jira Client ====
+
+class JiraClient:
+    """Jira API access for one site and board; connections and caches are created on first use."""
+
+    def __init__(self, config: JiraConfig):
+        self.config = config
+        self._session: Optional[requests.Session] = None
+        self._response_cache: Optional[JiraResponseCache] = None
+        # Reentrant: loading the field map under it makes a request, which creates the session and cache
+        self._lock = threading.RLock()
+        # Delta-sync high-water marks, keyed by sprint id
+        self._sync_states: Dict[int, SprintSyncState] = {}
+        self._field_map: Optional[IssueFieldMap] = None
+        self._field_map_expires = CACHE_FOREVER
+        self._board_ids: Optional[BoardIdCache] = None
+        self._story_points_extractor: Optional[Callable[[Dict[str, Any]], Optional[int]]] = None
+
+    @property
+    def session(self) -> requests.Session:
+        """The shared keep-alive session, created on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.config.pool_size,
+                        pool_maxsize=self.config.pool_size,
+                        pool_block=True  # Wait for a free connection instead of opening throwaway ones
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.auth = (self.config.email, self.config.api_token)
+                    session.headers.update({
+                        "Accept": "application/json",
+                        "Content-Type": "application/json"
+                    })
+                    self._session = session
+        return self._session
+
+    @property
+    def response_cache(self) -> Optional[JiraResponseCache]:
+        """The on-disk response cache, or None when caching is disabled."""
+        if self._response_cache is None and self.config.cache_dir:
+            with self._lock:
+                if self._response_cache is None:
+                    self._response_cache = JiraResponseCache(self.config.cache_dir)
+        return self._response_cache
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss/revalidation counters of the response cache."""
+        cache = self.response_cache
+        return cache.stats() if cache else {"hits": 0, "misses": 0, "revalidations": 0}
+
+    @property
+    def field_map(self) -> IssueFieldMap:
+        """Story-points and priority field ids of this site, resolved once from field metadata.
+
+        If the metadata can't be fetched, the default field map (which has no sprint field)
+        is used for FIELD_METADATA_RETRY seconds and the request is then tried again.
+        """
+        if self._field_map is None or time.time() >= self._field_map_expires:
+            # Concurrent sprint fetches wait for one metadata request instead of each making one
+            with self._lock:
+                if self._field_map is None or time.time() >= self._field_map_expires:
+                    metadata = self.request(f"{self.config.base_url}/rest/api/2/field", cache_ttl=FIELD_METADATA_TTL)
+                    if isinstance(metadata, list):
+                        field_map = resolve_field_map(metadata)
+                        self._field_map_expires = CACHE_FOREVER
+                    else:
+                        print(f"Could not read Jira field metadata. Using default story points fields "
+                              f"for {FIELD_METADATA_RETRY:g}s...")
+                        field_map = DEFAULT_FIELD_MAP
+                        self._field_map_expires = time.time() + FIELD_METADATA_RETRY
+                    self._story_points_extractor = make_story_points_extractor(field_map.story_points)
+                    self._field_map = field_map
+        return self._field_map
+
+    @property
+    def story_points_extractor(self) -> Callable[[Dict[str, Any]], Optional[int]]:
+        """Story-points extractor precomputed for this site's field ids."""
+        if self._story_points_extractor is None or time.time() >= self._field_map_expires:
+            self.field_map  # (Re)builds the extractor together with the field map
+        return self._story_points_extractor
+
+    def parse_user_story(self, issue: Dict[str, Any]) -> UserStory:
+        """Parse a Jira issue using this site's story-points field."""
+        return parse_user_story(issue, self.story_points_extractor)
+
+    def sprint_cache_ttl(self, sprint: Sprint) -> float:
+        """Closed sprints never change, so their pages are cached forever."""
+        return CACHE_FOREVER if sprint.state == "closed" else self.config.cache_ttl
+
+    def request(self, url: str, retry_count: int = 2, cache_ttl: Optional[float] = None,
+                use_cache: bool = True, keep_in_memory: bool = True) -> Optional[Dict[str, Any]]:
+        """Make a request to Jira API with caching, backoff and rate-limit aware retries.
+
+        `cache_ttl` is how long a cached response is served without asking Jira again;
+        None uses the configured default and CACHE_FOREVER never expires.
+        `keep_in_memory=False` caches the response on disk only (used for large pages).
+        """
+        return self.request_with_status(url, retry_count, cache_ttl, use_cache, keep_in_memory)[0]
+
+    def request_with_status(self, url: str, retry_count: int = 2, cache_ttl: Optional[float] = None,
+                            use_cache: bool = True,
+                            keep_in_memory: bool = True) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+        """Like request(), but also returns the status code of Jira's last response.
+
+        The status is None when Jira wasn't asked (a fresh cached body) or never answered.
+        """
+        if cache_ttl is None:
+            cache_ttl = self.config.cache_ttl
+        cache = self.response_cache if use_cache else None
+        entry = cache.get(url, keep_in_memory) if cache else None
+        if entry and entry.is_fresh(time.time()):
+            cache.record("hit")
+            return entry.body, None
+
+        # Only throttling, gateway and connection failures may fall back to a stale cached
+        # body; auth errors and missing resources must reach the caller
+        transient = False
+        status = None
+        for attempt in range(retry_count + 1):
+            try:
+                print(f"Making request to: {url} (attempt {attempt + 1})")
+                response = self.session.get(url, headers=_conditional_headers(entry), timeout=60)  # Increased timeout
+                status = response.status_code
+                if response.status_code == 304 and entry:
+                    cache.refresh(entry, cache_ttl, keep_in_memory)
+                    cache.record("revalidated")
+                    return entry.body, status
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < retry_count:
+                    # Jira's own wait is honoured; retrying sooner only earns another 429
+                    delay = _rate_limit_delay(response)
+                    if delay is None:
+                        delay = _backoff_delay(attempt, self.config.backoff_base, self.config.backoff_max)
+                    else:
+                        delay = min(delay, self.config.rate_limit_max)
+                    print(f"Jira returned {response.status_code}. Retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+                    continue
+                transient = _is_transient_status(response.status_code)
+                response.raise_for_status()
+                data = response.json()
+                if cache:
+                    cache.put(url, data, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                              cache_ttl, keep_in_memory)
+                    cache.record("miss")
+                return data, status
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                transient = True
+                status = None
+                print(f"Connection problem on attempt {attempt + 1}: {e}")
+                if attempt < retry_count:
+                    delay = _backoff_delay(attempt, self.config.backoff_base, self.config.backoff_max)
+                    print(f"Retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+                    continue
+                else:
+                    print("Max retries reached. Continuing with partial data...")
+                    break
+            except requests.exceptions.RequestException as e:
+                print(f"Error making request to {url}: {e}")
+                if hasattr(e, 'response') and e.response is not None:
+                    print(f"Response status: {e.response.status_code}")
+                    print(f"Response content: {e.response.text}")
+                    if e.response.status_code in GONE_STATUS_CODES and entry:
+                        # e.g. a board id that no longer exists: its old body must not come back
+                        cache.discard(url)
+                        entry = None
+                break
+            except ValueError as e:
+                print(f"Error parsing JSON response: {e}")
+                break
+
+        if entry and transient:
+            print(f"Error making request to {url}: Jira unavailable. Using cached response from "
+                  f"{datetime.fromtimestamp(entry.fetched_at, timezone.utc).isoformat(timespec='seconds')}...")
+            return entry.body, status
+        return None, status
+
+    def iter_paginated(self, url: str, items_key: str, page_size: int = 50, max_items: Optional[int] = None,
+                       max_workers: Optional[int] = None, first_page: Optional[Dict[str, Any]] = None,
+                       **request_kwargs) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the items of a startAt/maxResults endpoint page by page, in order.
+
+        The first page reports `total`; later pages are prefetched concurrently, but at
+        most `max_workers` of them are held at once so memory stays bounded by page size.
+        `url` must already contain a query string. Pass `first_page` if it was already fetched.
+        Pages are cached on disk only, so a cached sprint isn't held in memory either.
+        """
+        max_workers = max_workers or self.config.max_workers
+        request_kwargs.setdefault("keep_in_memory", False)
+
+        def fetch_page(start_at: int) -> Optional[Dict[str, Any]]:
+            return self.request(f"{url}&startAt={start_at}&maxResults={page_size}", **request_kwargs)
+
+        if first_page is None:
+            first_page = fetch_page(0)
+            if not first_page:
+                print(f"Failed to fetch first page of {items_key}.")
+                return
+
+        total = first_page.get("total", len(first_page.get(items_key, [])))
+        if max_items is not None:
+            total = min(total, max_items)
+        # Jira may cap maxResults below what was asked for, so step by what it actually returned
+        stride = first_page.get("maxResults") or page_size
+        items = first_page.get(items_key, [])
+        first_page = None  # Only the item list is kept alive past this point
+
+        remaining = total
+        if items:
+            yield items[:remaining]
+            remaining -= len(items)
+        offsets = iter(range(stride, total, stride) if items else [])
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            pending = deque()
+            for start_at in offsets:
+                pending.append((start_at, executor.submit(fetch_page, start_at)))
+                if len(pending) >= max_workers:
+                    break
+
+            while pending and remaining > 0:
+                start_at, future = pending.popleft()
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    pending.append((next_offset, executor.submit(fetch_page, next_offset)))
+
+                data = future.result()
+                if not data:
+                    print(f"Failed to fetch {items_key} starting at {start_at}. Using partial data...")
+                    continue
+                items = data.get(items_key, [])
+                data = None
+                yield items[:remaining]
+                remaining -= len(items)
+
+    def fetch_paginated(self, url: str, items_key: str, page_size: int = 50, max_items: Optional[int] = None,
+                        max_workers: Optional[int] = None, **request_kwargs) -> Optional[List[Dict[str, Any]]]:
+        """Fetch every page of a startAt/maxResults endpoint into one ordered list.
+
+        Returns None if the first page could not be fetched.
+        """
+        request_kwargs.setdefault("keep_in_memory", False)
+        first_page = self.request(f"{url}&startAt=0&maxResults={page_size}", **request_kwargs)
+        if not first_page:
+            return None
+
+        all_items = []
+        for page in self.iter_paginated(url, items_key, page_size, max_items, max_workers, first_page,
+                                        **request_kwargs):
+            all_items.extend(page)
+        print(f"Fetched {len(all_items)} {items_key}")
+        return all_items
+
+    @property
+    def board_ids(self) -> BoardIdCache:
+        """Persistent board name -> id cache."""
+        if self._board_ids is None:
+            with self._lock:
+                if self._board_ids is None:
+                    self._board_ids = BoardIdCache(self.config.cache_dir)
+        return self._board_ids
+
+    def get_board_id_by_name(self, board_name: str) -> Optional[int]:
+        """Get board ID by board name, paging through the name-filtered board list."""
+        # The name filter is a case-insensitive substring match, so check for the exact name
+        url = f"{self.config.base_url}/rest/agile/1.0/board?name={quote(board_name)}"
+
+        case_insensitive_match = None
+        for boards in self.iter_paginated(url, "values"):
+            for board in boards:
+                name = board.get("name") or ""
+                if name == board_name:
+                    return board.get("id")
+                if case_insensitive_match is None and name.lower() == board_name.lower():
+                    case_insensitive_match = board.get("id")
+
+        if case_insensitive_match is not None:
+            return case_insensitive_match
+        print(f"Board '{board_name}' not found.")
+        return None
+
+    def _board_cache_key(self) -> str:
+        return f"{self.config.base_url}|{self.config.board_id}"
+
+    def resolve_board_id(self) -> Optional[int]:
+        """The configured board as a numeric id, looking it up by name (once) if needed."""
+        board = self.config.board_id
+        if board.isdigit():
+            return int(board)
+
+        board_id = self.board_ids.get(self._board_cache_key())
+        if board_id is not None:
+            return board_id
+
+        print(f"Board identifier '{board}' is not numeric. Looking up board ID...")
+        board_id = self.get_board_id_by_name(board)
+        if board_id is not None:
+            self.board_ids.put(self._board_cache_key(), board_id)
+        return board_id
+
+    def _forget_board_id(self, status: Optional[int]) -> bool:
+        """Invalidate the cached id of a board configured by name once Jira reports that id gone."""
+        if status not in GONE_STATUS_CODES or self.config.board_id.isdigit():
+            return False
+        if self.board_ids.forget(self._board_cache_key()):
+            print(f"Board '{self.config.board_id}' could not be read by its cached id. Looking it up again...")
+            return True
+        return False
+
+    def get_active_sprint(self) -> Optional[Sprint]:
+        """Fetch the active sprint from the configured board."""
+        board_id = self.resolve_board_id()
+        if not board_id:
+            return None
+        
+        data, status = self.request_with_status(
+            f"{self.config.base_url}/rest/agile/1.0/board/{board_id}/sprint?state=active")
+        if not data and self._forget_board_id(status):
+            board_id = self.resolve_board_id()
+            if board_id:
+                data = self.request(f"{self.config.base_url}/rest/agile/1.0/board/{board_id}/sprint?state=active")
+        if not data:
+            return None
+        
+        sprints = data.get("values", [])
+        if not sprints:
+            print("No active sprints found.")
+            return None
+        
+        sprint_data = sprints[0]
+        
+        return Sprint(
+            id=sprint_data.get("id"),
+            name=sprint_data.get("name"),
+            state=sprint_data.get("state"),
+            start_date=sprint_data.get("startDate"),
+            end_date=sprint_data.get("endDate"),
+            complete_date=sprint_data.get("completeDate"),
+            board_id=sprint_data.get("originBoardId"),
+            goal=sprint_data.get("goal", "")
+        )
+
+    def get_sprint_issues(self, sprint_id: int, max_issues: Optional[int] = None,
+                          cache_ttl: Optional[float] = None,
+                          max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get all issues in a sprint, fetching pages concurrently."""
+        url = f"{self.config.base_url}/rest/agile/1.0/sprint/{sprint_id}/issue?fields={self.field_map.fields_param}"
+
+        issues = self.fetch_paginated(url, "issues", max_items=max_issues, max_workers=max_workers,
+                                      cache_ttl=cache_ttl)
+        if issues is None:
+            print(f"Failed to fetch issues for sprint {sprint_id}.")
+            return []
+        return issues
+
+    def iter_sprint_user_stories(self, sprint_id: int, cache_ttl: Optional[float] = None,
+                                 max_workers: Optional[int] = None) -> Iterator[UserStory]:
+        """Stream a sprint's issues as parsed UserStory objects, releasing each raw page once parsed."""
+        url = f"{self.config.base_url}/rest/agile/1.0/sprint/{sprint_id}/issue?fields={self.field_map.fields_param}"
+
+        for page in self.iter_paginated(url, "issues", max_workers=max_workers, cache_ttl=cache_ttl):
+            for issue in page:
+                yield self.parse_user_story(issue)
+
+    def search_issues(self, jql: str) -> Optional[List[Dict[str, Any]]]:
+        """Run a JQL search and return every matching issue, or None if the search failed."""
+        url = f"{self.config.base_url}/rest/api/2/search?jql={quote(jql)}&fields={self.field_map.fields_param}"
+        return self.fetch_paginated(url, "issues", use_cache=False)  # Search results are never reused
+
+    def get_sprint_status(self, delta: bool = False) -> Optional[SprintStatus]:
+        """Get complete sprint status with all user stories and metrics.
+
+        With `delta=True`, a sprint that was synced before only has the issues updated
+        since the last sync fetched and merged in. Issues moved out of the sprint are
+        only noticed by the full re-download done every `full_sync_interval` seconds.
+        """
+        
+        # Get active sprint
+        sprint = self.get_active_sprint()
+        if not sprint:
+            print("No active sprint found.")
+            return None
+        
+        print(f"Found active sprint: {sprint.name}")
+
+        sync_started = time.time()
+        state = self._sync_states.get(sprint.id)
+        if delta and state and sync_started - state.last_full_sync < self.config.full_sync_interval:
+            return self._delta_sync_sprint_status(sprint, state, sync_started)
+        
+        # Stream the sprint's issues straight into UserStory objects
+        user_stories = list(self.iter_sprint_user_stories(sprint.id))
+        if not user_stories:
+            print("No issues found in sprint.")
+            return None
+        
+        print(f"Found {len(user_stories)} issues in sprint")
+        
+        sprint_status = build_sprint_status(sprint, user_stories)
+        self._sync_states[sprint.id] = SprintSyncState(sprint_status, sync_started, sync_started)
+        
+        return sprint_status
+
+    def _delta_sync_sprint_status(self, sprint: Sprint, state: SprintSyncState,
+                                  sync_started: float) -> SprintStatus:
+        """Merge issues updated since the last sync into the previously fetched sprint status."""
+        # JQL only has minute precision, so look back one extra minute to cover the boundary
+        minutes = int((sync_started - state.last_sync) // 60) + 2
+        changed_issues = self.search_issues(f'sprint = {sprint.id} AND updated >= "-{minutes}m"')
+        if changed_issues is None:
+            print("Delta sync failed. Using previously synced data...")
+            return state.sprint_status
+
+        print(f"Delta sync found {len(changed_issues)} updated issues in sprint")
+        sprint_status = state.sprint_status
+        if changed_issues:
+            stories = {story.id: story for story in sprint_status.user_stories}
+            for issue in changed_issues:
+                story = self.parse_user_story(issue)
+                stories[story.id] = story
+            sprint_status = build_sprint_status(sprint, list(stories.values()))
+
+        self._sync_states[sprint.id] = SprintSyncState(sprint_status, sync_started, state.last_full_sync)
+        return sprint_status
+
+    def fetch_sprint_statuses_bulk(self, sprints: List[Sprint], batch_size: int = 50) -> List[SprintStatus]:
+        """Fetch the issues of many sprints through one JQL search stream per batch of sprints.
+
+        Issues are split into SprintStatus objects by their sprint field; an issue carried
+        over between sprints counts towards each of them, as it does on the agile endpoint.
+        """
+        sprint_field = self.field_map.sprint
+        if not sprint_field:
+            print("Sprint field not found in Jira field metadata. Fetching sprints one by one...")
+            return [status for status in map(self._fetch_sprint_status_safely, sprints) if status]
+
+        stories_by_sprint: Dict[int, List[UserStory]] = {sprint.id: [] for sprint in sprints}
+        for i in range(0, len(sprints), batch_size):
+            batch = sprints[i:i + batch_size]
+            jql = f"sprint in ({', '.join(str(sprint.id) for sprint in batch)}) ORDER BY Rank ASC"
+            url = (f"{self.config.base_url}/rest/api/2/search?jql={quote(jql)}"
+                   f"&fields={self.field_map.fields_param_with_sprint}")
+            # A batch made only of closed sprints can never change
+            cache_ttl = CACHE_FOREVER if all(sprint.state == "closed" for sprint in batch) else None
+
+            for page in self.iter_paginated(url, "issues", page_size=100, cache_ttl=cache_ttl):
+                for issue in page:
+                    story = self.parse_user_story(issue)
+                    for sprint_id in issue_sprint_ids(issue, sprint_field):
+                        if sprint_id in stories_by_sprint:
+                            stories_by_sprint[sprint_id].append(story)
+
+        return [
+            build_sprint_status(sprint, stories_by_sprint[sprint.id])
+            for sprint in sprints
+            if stories_by_sprint[sprint.id]
+        ]
+
+    def get_all_sprints(self, board_id: int) -> List[Sprint]:
+        """Fetch all sprints from the Jira board."""
+        return self._get_all_sprints(board_id)[0]
+
+    def _get_all_sprints(self, board_id: int) -> Tuple[List[Sprint], Optional[int]]:
+        """All sprints of the board, with the status code of the request for the last page read."""
+        sprints = []
+        start_at = 0
+        while True:
+            url = f"{self.config.base_url}/rest/agile/1.0/board/{board_id}/sprint?startAt={start_at}&maxResults=50"
+            data, status = self.request_with_status(url)
+            if not data or "values" not in data:
+                break
+
+            for s in data["values"]:
+                sprints.append(Sprint(
+                    id=s["id"],
+                    name=s["name"],
+                    state=s["state"],
+                    start_date=s.get("startDate"),
+                    end_date=s.get("endDate"),
+                    complete_date=s.get("completeDate"),
+                    board_id=s.get("originBoardId"),
+                    goal=s.get("goal")
+                ))
+
+            if data.get("isLast", True):
+                break
+            start_at += 50
+        return sprints, status
+
+    def get_sprint_status_for_sprint(self, sprint: Sprint) -> Optional[SprintStatus]:
+        user_stories = list(self.iter_sprint_user_stories(sprint.id, cache_ttl=self.sprint_cache_ttl(sprint)))
+        if not user_stories:
+            return None
+        return build_sprint_status(sprint, user_stories)
+
+    def fetch_all_sprint_statuses(self, limit: int = 2, max_workers: Optional[int] = None,
+                                  bulk: bool = False) -> List[SprintStatus]:
+        """
+        Fetch the last `limit` number of sprints (including active sprint) and generate SprintStatus list.
+        
+        Args:
+            limit (int): Number of most recent sprints to fetch. Default is 2.
+            max_workers (int): Number of sprints fetched concurrently. 1 fetches them one at a time.
+            bulk (bool): Fetch all sprints through a single `sprint in (...)` JQL search instead.
+        
+        Returns:
+            List[SprintStatus]: List of populated SprintStatus dataclass instances, oldest first.
+        """
+        print(f"Fetching last {limit} sprints and generating SprintStatus list...")
+        max_workers = max_workers or self.config.max_workers
+
+        board_id = self.resolve_board_id()
+        if not board_id:
+            print("Board ID not found. Exiting.")
+            return []
+
+        all_sprints, status = self._get_all_sprints(board_id)
+        if not all_sprints and self._forget_board_id(status):
+            board_id = self.resolve_board_id()
+            all_sprints = self.get_all_sprints(board_id) if board_id else []
+        if not all_sprints:
+            print("No sprints found on board.")
+            return []
+
+        recent_sprints = all_sprints[-limit:]  # Adjust how many sprints to return
+        if bulk:
+            return self.fetch_sprint_statuses_bulk(recent_sprints)
+        if max_workers > 1 and len(recent_sprints) > 1:
+            # map() yields results in submission order, so the list stays oldest-first
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(recent_sprints))) as executor:
+                statuses = list(executor.map(self._fetch_sprint_status_safely, recent_sprints))
+        else:
+            statuses = [self._fetch_sprint_status_safely(sprint) for sprint in recent_sprints]
+
+        return [status for status in statuses if status]
+
+    def _fetch_sprint_status_safely(self, sprint: Sprint) -> Optional[SprintStatus]:
+        """Fetch one sprint's status, treating unexpected errors as missing data."""
+        try:
+            return self.get_sprint_status_for_sprint(sprint)
+        except Exception as e:
+            print(f"Error fetching sprint '{sprint.name}': {e}. Continuing with partial data...")
+            return None
+
+# ==== Default Client ====
+
+_default_client: Optional[JiraClient] = None
+_default_client_lock = threading.Lock()
+
+def get_client() -> JiraClient:
+    """The client configured from the environment, built on first use.
+
+    Raises JiraConfigError if required settings are missing.
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = JiraClient(JiraConfig.from_env())
+    return _default_client
+
+def set_client(client: Optional[JiraClient]) -> None:
+    """Replace the default client, e.g. with one built from an injected config."""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+# ==== Jira API Functions ====
+# Thin wrappers around the default client, kept for existing callers.
+
+def make_jira_request(url: str, retry_count: int = 2, cache_ttl: Optional[float] = None,
+                      use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """Make a request to Jira API through the default client."""
+    return get_client().request(url, retry_count, cache_ttl, use_cache)
+
+def get_cache_stats() -> Dict[str, int]:
+    """Hit/miss/revalidation counters of the default client's response cache."""
+    return get_client().cache_stats()
+
+def get_board_id_by_name(board_name: str) -> Optional[int]:
+    """Get board ID by board name."""
+    return get_client().get_board_id_by_name(board_name)
+
+def get_active_sprint() -> Optional[Sprint]:
+    """Fetch the active sprint from the specified board."""
+    return get_client().get_active_sprint()
+
+def get_sprint_issues(sprint_id: int, max_issues: Optional[int] = None, cache_ttl: Optional[float] = None,
+                      max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Get all issues in a sprint, fetching pages concurrently."""
+    return get_client().get_sprint_issues(sprint_id, max_issues, cache_ttl, max_workers)
+
+def iter_sprint_user_stories(sprint_id: int, cache_ttl: Optional[float] = None,
+                             max_workers: Optional[int] = None) -> Iterator[UserStory]:
+    """Stream a sprint's issues as parsed UserStory objects."""
+    return get_client().iter_sprint_user_stories(sprint_id, cache_ttl, max_workers)
+
+def search_issues(jql: str) -> Optional[List[Dict[str, Any]]]:
+    """Run a JQL search and return every matching issue, or None if the search failed."""
+    return get_client().search_issues(jql)
+
+def get_sprint_status(delta: bool = False) -> Optional[SprintStatus]:
+    """Get complete sprint status with all user stories and metrics."""
+    return get_client().get_sprint_status(delta)
+
+def get_all_sprints(board_id: int) -> List[Sprint]:
+    """Fetch all sprints from the Jira board."""
+    return get_client().get_all_sprints(board_id)
+
+def get_sprint_status_for_sprint(sprint: Sprint) -> Optional[SprintStatus]:
+    return get_client().get_sprint_status_for_sprint(sprint)
+
+def fetch_all_sprint_statuses(limit: int = 2, max_workers: Optional[int] = None,
+                              bulk: bool = False) -> List[SprintStatus]:
+    """Fetch the last `limit` sprints (including the active one) as SprintStatus objects, oldest first."""
+    return get_client().fetch_all_sprint_statuses(limit, max_workers, bulk)
 
 def print_sample_data(sprint_status: SprintStatus):
     """Print a sample of the data structure for verification."""
@@ -332,104 +1009,7 @@ def print_sprint_status(sprint_status: SprintStatus):
     if len(sprint_status.user_stories) > 5:
         print(f"... and {len(sprint_status.user_stories) - 5} more stories")
 
-def get_all_sprints(board_id: int) -> List[Sprint]:
-    """Fetch all sprints from the Jira board."""
-    sprints = []
-    start_at = 0
-    while True:
-        url = f"{JIRA_BASE_URL}/rest/agile/1.0/board/{board_id}/sprint?startAt={start_at}&maxResults=50"
-        data = make_jira_request(url)
-        if not data or "values" not in data:
-            break
-
-        for s in data["values"]:
-            sprints.append(Sprint(
-                id=s["id"],
-                name=s["name"],
-                state=s["state"],
-                start_date=s.get("startDate"),
-                end_date=s.get("endDate"),
-                complete_date=s.get("completeDate"),
-                board_id=s.get("originBoardId"),
-                goal=s.get("goal")
-            ))
-
-        if data.get("isLast", True):
-            break
-        start_at += 50
-    return sprints
-
-def get_sprint_status_for_sprint(sprint: Sprint) -> Optional[SprintStatus]:
-    issues = get_sprint_issues(sprint.id)
-    if not issues:
-        return None
-    user_stories = [parse_user_story(issue) for issue in issues]
-    metrics = calculate_sprint_metrics(user_stories, sprint)
-
-    return SprintStatus(
-        sprint_name=sprint.name,
-        start_date=sprint.start_date.split("T")[0] if sprint.start_date else "",
-        end_date=sprint.end_date.split("T")[0] if sprint.end_date else "",
-        completion=metrics["completion"],
-        target=metrics["target"],
-        critical_bugs=metrics["critical_bugs"],
-        unassigned_stories=metrics["unassigned_stories"],
-        velocity=metrics["velocity"],
-        planned_velocity=metrics["planned_velocity"],
-        user_stories=user_stories
-    )
-
-def generate_sprint_code_array(sprint_statuses: List[SprintStatus]) -> str:
-    def format_user_story(story: UserStory) -> str:
-        tags_str = f', {story.tags}' if story.tags else ''
-        return f'UserStory("{story.id}", "{story.title}", "{story.assignee}", "{story.start_date}", "{story.status}", {story.story_points}{tags_str})'
-
-    code_lines = ['self.sprints = [']
-    for sprint in sprint_statuses:
-        code_lines.append(f'    SprintStatus(')
-        code_lines.append(f'        sprint_name="{sprint.sprint_name}",')
-        code_lines.append(f'        start_date="{sprint.start_date}",')
-        code_lines.append(f'        end_date="{sprint.end_date}",')
-        code_lines.append(f'        completion={sprint.completion},')
-        code_lines.append(f'        target={sprint.target},')
-        code_lines.append(f'        critical_bugs={sprint.critical_bugs},')
-        code_lines.append(f'        unassigned_stories={sprint.unassigned_stories},')
-        code_lines.append(f'        velocity={sprint.velocity},')
-        code_lines.append(f'        planned_velocity={sprint.planned_velocity},')
-        code_lines.append(f'        user_stories=[')
-        for story in sprint.user_stories:
-            code_lines.append(f'            {format_user_story(story)},')
-        code_lines.append(f'        ]')
-        code_lines.append(f'    ),')
-    code_lines.append(']')
-    return '\n'.join(code_lines)
-
-def fetch_all_sprint_statuses(limit: int = 2) -> List[SprintStatus]:
-    """
-    Fetch the last `limit` number of sprints (including active sprint) and generate SprintStatus list.
-    
-    Args:
-        limit (int): Number of most recent sprints to fetch. Default is 3.
-    
-    Returns:
-        List[SprintStatus]: List of populated SprintStatus dataclass instances.
-    """
-    print(f"Fetching last {limit} sprints and generating SprintStatus list...")
-
-    board_id = int(JIRA_BOARD_ID) if JIRA_BOARD_ID.isdigit() else get_board_id_by_name(JIRA_BOARD_ID)
-    if not board_id:
-        print("Board ID not found. Exiting.")
-        return []
-
-    all_sprints = get_all_sprints(board_id)
-    if not all_sprints:
-        print("No sprints found on board.")
-        return []
-
-    sprint_statuses = []
-    for sprint in all_sprints[-limit:]:  # Adjust how many sprints to return
-        status = get_sprint_status_for_sprint(sprint)
-        if status:
-            sprint_statuses.append(status)
-
-    return sprint_statuses
+def save_sprint_snapshot(path: str, sprint_statuses: List[SprintStatus]) -> None:
+    """Persist fetched sprints as a binary snapshot that DataStore can start from."""
+    write_snapshot(path, sprints=sprint_statuses)
+    print(f"Saved {len(sprint_statuses)} sprints to snapshot {path}")
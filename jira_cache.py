@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+MEMORY_ENTRIES = 32          # Responses also kept in memory, least recently used dropped first
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    ttl: Optional[float]         # None or infinity means the entry never expires
+
+    def is_fresh(self, now: float) -> bool:
+        return self.ttl is None or now - self.fetched_at < self.ttl
+
+
+class JiraResponseCache:
+    """Persistent, URL-keyed cache of Jira JSON responses with revalidation metadata.
+
+    Every response is written to disk. Only a few small ones (field metadata, sprint
+    lists) are also kept in a bounded in-memory LRU; issue pages are read back from disk
+    when needed, so memory does not grow with the size of a sprint.
+    """
+
+    def __init__(self, cache_dir: str, memory_entries: int = MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str, keep_in_memory: bool = True) -> Optional[CacheEntry]:
+        """Return the cached entry for a URL, fresh or stale."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                return entry
+
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        if keep_in_memory:
+            self._remember(entry)
+        return entry
+
+    def put(self, url: str, body: Any, etag: Optional[str], last_modified: Optional[str],
+            ttl: Optional[float], keep_in_memory: bool = True) -> None:
+        """Store a response and write it through to disk."""
+        entry = CacheEntry(url, body, etag, last_modified, time.time(), ttl)
+        if keep_in_memory:
+            self._remember(entry)
+        else:
+            with self._lock:
+                self._entries.pop(url, None)
+        self._write(entry)
+
+    def refresh(self, entry: CacheEntry, ttl: Optional[float], keep_in_memory: bool = True) -> None:
+        """Mark a stale entry as fresh again after a 304 Not Modified."""
+        self.put(entry.url, entry.body, entry.etag, entry.last_modified, ttl, keep_in_memory)
+
+    def discard(self, url: str) -> None:
+        """Forget a response, e.g. because Jira reports the resource no longer exists."""
+        with self._lock:
+            self._entries.pop(url, None)
+        try:
+            os.remove(self._path(url))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Could not remove Jira cache entry for {url}: {e}")
+
+    def _remember(self, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[entry.url] = entry
+            self._entries.move_to_end(entry.url)
+            while len(self._entries) > self.memory_entries:
+                self._entries.popitem(last=False)
+
+    def _write(self, entry: CacheEntry) -> None:
+        path = self._path(entry.url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(entry), f)
+            os.replace(tmp_path, path)  # Atomic, so readers never see a half-written file
+        except OSError as e:
+            print(f"Could not write Jira cache entry for {entry.url}: {e}")
+
+    def record(self, outcome: str) -> None:
+        """Count a lookup outcome: 'hit', 'miss' or 'revalidated'."""
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "revalidated":
+                self.revalidations += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations}
+
+
+class BoardIdCache:
+    """Persistent board name -> id mapping, shared by every client using the same cache directory."""
+
+    def __init__(self, cache_dir: Optional[str]):
+        self.path = os.path.join(cache_dir, "board_ids.json") if cache_dir else None
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.path:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._ids = {key: int(board_id) for key, board_id in json.load(f).items()}
+            except (OSError, ValueError, TypeError, AttributeError):
+                self._ids = {}
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            return self._ids.get(key)
+
+    def put(self, key: str, board_id: int) -> None:
+        with self._lock:
+            self._ids[key] = board_id
+            self._save()
+
+    def forget(self, key: str) -> bool:
+        """Drop a mapping; returns True if there was one."""
+        with self._lock:
+            if self._ids.pop(key, None) is None:
+                return False
+            self._save()
+            return True
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._ids, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not write board id cache: {e}")
@@ -0,0 +1,97 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+from data_stores import DataSnapshot, DataStore
+
+# A fetcher returns the collections to publish, keyed like DataStore.publish's arguments
+Fetcher = Callable[[], Optional[Dict[str, Sequence]]]
+
+
+def jira_sprint_fetcher(limit: int = 6, bulk: bool = True) -> Fetcher:
+    """Fetcher pulling the last `limit` sprints from the Jira board configured in the environment."""
+    def fetch() -> Optional[Dict[str, Sequence]]:
+        import jira_agent  # Only needed once a refresh actually runs
+
+        sprints = jira_agent.fetch_all_sprint_statuses(limit=limit, bulk=bulk)
+        return {"sprints": sprints} if sprints else None
+    return fetch
+
+
+class SnapshotRefresher:
+    """Periodically runs a fetcher on a background thread and publishes the result to a DataStore.
+
+    Requests never wait for a refresh: they keep reading the current snapshot until the
+    new one is swapped in. A failed, empty or unchanged fetch keeps the current snapshot.
+    """
+
+    def __init__(self, data_store: DataStore, fetcher: Fetcher, interval: float = 300.0):
+        self.data_store = data_store
+        self.fetcher = fetcher
+        self.interval = interval
+        self.last_error: Optional[str] = None
+        self.last_refresh: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, refresh_immediately: bool = True):
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(refresh_immediately,), name="snapshot-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def refresh_now(self) -> Optional[DataSnapshot]:
+        """Run one fetch and publish it if it differs from the current snapshot.
+
+        Returns the new snapshot, or None if nothing was published.
+        """
+        with self._refresh_lock:
+            try:
+                collections = self.fetcher()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Background refresh failed: {e}. Keeping data version {self.data_store.version}...")
+                return None
+
+            if not collections:
+                print(f"Background refresh returned no data. Keeping data version {self.data_store.version}...")
+                return None
+
+            current = self.data_store.snapshot
+            self.last_error = None
+            self.last_refresh = time.time()
+            if all(tuple(rows) == getattr(current, name) for name, rows in collections.items()):
+                print(f"Background refresh found no changes. Keeping data version {current.version}...")
+                return None
+
+            snapshot = self.data_store.publish(**collections)
+            print(f"Published data version {snapshot.version}")
+            return snapshot
+
+    def status(self) -> Dict[str, Optional[float]]:
+        """Current data version and age, plus when the last successful refresh ran."""
+        return {
+            "version": self.data_store.version,
+            "age": self.data_store.age,
+            "last_refresh": self.last_refresh,
+            "last_error": self.last_error,
+        }
+
+    def _run(self, refresh_immediately: bool):
+        if refresh_immediately:
+            self.refresh_now()
+        while not self._stop.wait(self.interval):
+            self.refresh_now()
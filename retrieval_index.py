@@ -0,0 +1,268 @@
+"""
+In-memory BM25 index over the records a question can be about.
+
+Documents are user stories (title, tags, assignee), daily updates (blockers,
+achievements, comments) and analyzer results with flags. The index follows the
+DataStore: a new data version re-indexes only the sprints and members its change log
+marks as changed, and only the records among them that actually differ. Queries
+score just the postings of their terms, so retrieval stays well under a millisecond.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from data_models import AnalysisResult
+from data_stores import DataSnapshot, DataStore
+from system_generator import SystemContextGenerator
+
+DEFAULT_TOP_K = 8
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+")
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for", "from", "has", "have",
+    "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "s", "so", "that", "the", "this",
+    "to", "was", "we", "what", "when", "which", "who", "why", "with", "you", "our", "any",
+})
+
+Key = Tuple[str, Hashable, int]      # (kind, group, position in group)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Inverted index with BM25 scoring; documents can be added and removed at any time.
+
+    Every document gets an integer slot, and each term's postings are mirrored in NumPy
+    arrays of slots and term frequencies, so a query scores a term's whole posting
+    list in one vectorized step. Arrays of terms touched by add/remove are rebuilt by
+    `prepare()` (or lazily by the next search that needs them).
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}       # Term -> slot -> term frequency
+        self.slots: Dict[Hashable, int] = {}
+        self._keys: List[Optional[Hashable]] = []            # Slot -> key
+        self._free: List[int] = []
+        self._lengths = np.zeros(0, dtype=np.float64)        # Slot -> document length
+        self._terms: Dict[int, Tuple[str, ...]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._dirty: Set[str] = set()
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def add(self, key: Hashable, text: str):
+        if key in self.slots:
+            self.remove(key)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._keys)
+            self._keys.append(None)
+            if slot >= len(self._lengths):
+                self._lengths = np.concatenate([self._lengths, np.zeros(max(slot, 64), dtype=np.float64)])
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        for term, count in counts.items():
+            self.postings.setdefault(term, {})[slot] = count
+        self._dirty.update(counts)
+        self.slots[key] = slot
+        self._keys[slot] = key
+        self._lengths[slot] = len(tokens)
+        self._terms[slot] = tuple(counts)
+        self._total_length += len(tokens)
+
+    def remove(self, key: Hashable):
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return
+        for term in self._terms.pop(slot):
+            posting = self.postings[term]
+            del posting[slot]
+            if not posting:
+                del self.postings[term]
+            self._dirty.add(term)
+        self._total_length -= int(self._lengths[slot])
+        self._lengths[slot] = 0
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def prepare(self):
+        """Rebuild the posting arrays of every term changed since the last call."""
+        for term in self._dirty:
+            self._rebuild(term)
+        self._dirty.clear()
+
+    def _rebuild(self, term: str):
+        posting = self.postings.get(term)
+        if posting is None:
+            self._arrays.pop(term, None)
+        else:
+            self._arrays[term] = (np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                                  np.fromiter(posting.values(), dtype=np.float64, count=len(posting)))
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K) -> List[Tuple[Hashable, float]]:
+        """Top `k` (key, score) pairs for `query`, best first."""
+        n = len(self.slots)
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        if not n or not terms or k <= 0:
+            return []
+        average_length = self._total_length / n or 1.0
+        k1, b = self.k1, self.b
+        scores = np.zeros(len(self._keys), dtype=np.float64)
+        for term in terms:
+            if term in self._dirty:
+                self._rebuild(term)
+                self._dirty.discard(term)
+            slots, tf = self._arrays[term]
+            idf = math.log(1 + (n - len(slots) + 0.5) / (len(slots) + 0.5))
+            norm = k1 * (1 - b + b * self._lengths[slots] / average_length)
+            scores[slots] += idf * tf * (k1 + 1) / (tf + norm)
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            # Keep everything tied with the k-th score, so ties are broken by slot below
+            threshold = np.partition(scores[matched], -k)[-k]
+            matched = matched[scores[matched] >= threshold]
+        # Best first; equal scores in slot order (the order documents were indexed in)
+        best = matched[np.lexsort((matched, -scores[matched]))][:k].tolist()
+        return [(self._keys[slot], float(scores[slot])) for slot in best]
+
+
+@dataclass
+class SearchHit:
+    kind: str                 # "story", "update" or "finding"
+    score: float
+    line: str
+
+
+class RetrievalIndex:
+    """BM25 index of stories, daily updates and analyzer findings, kept in step with a DataStore."""
+
+    def __init__(self, data_store: DataStore):
+        self.data_store = data_store
+        self.index = BM25Index()
+        self.version: Optional[int] = None
+        self.reindexed = 0          # Documents (re-)tokenized so far
+        self._docs: Dict[Key, Any] = {}
+        self._groups: Dict[Tuple[str, Hashable], int] = {}      # (kind, group) -> documents in it
+        self._results: Sequence[AnalysisResult] = ()
+        self._lock = threading.Lock()
+
+    # ==== Indexing ====
+
+    def refresh(self, snapshot: Optional[DataSnapshot] = None, analysis_results: Sequence[AnalysisResult] = ()):
+        """Bring the index up to `snapshot` (the store's current one by default).
+
+        When the store's change log covers the gap, only changed sprints and members
+        are looked at; otherwise every record is compared with the indexed one.
+        Analyzer results are compared by identity first, so reused results cost nothing.
+        """
+        snapshot = snapshot if snapshot is not None else self.data_store.snapshot
+        with self._lock:
+            if self.version != snapshot.version:
+                changes = None
+                if self.version is not None:
+                    changes = self.data_store.changes_since(self.version, snapshot.version)
+                sprints = changes.sprints if changes is not None else None
+                members = changes.members if changes is not None else None
+
+                stories = {sprint.sprint_name: sprint.user_stories for sprint in snapshot.sprints
+                           if sprints is None or sprint.sprint_name in sprints}
+                self._sync("story", stories, sprints)
+                updates = {}
+                for update in snapshot.daily_updates:
+                    if members is None or update.member_id in members:
+                        updates.setdefault(update.member_id, []).append(update)
+                self._sync("update", updates, members)
+                self.version = snapshot.version
+
+            if analysis_results is not self._results:
+                findings = {}
+                for result in analysis_results:
+                    if result.flags:
+                        findings.setdefault((result.agent_type, result.member_id), []).append(result)
+                self._sync("finding", findings, None)
+                self._results = analysis_results
+            self.index.prepare()
+
+    def _sync(self, kind: str, groups: Dict[Hashable, Sequence[Any]], scope: Optional[Set[Hashable]]):
+        """Make the `kind` documents of every group in `scope` (all groups if None) match `groups`."""
+        if scope is None:
+            scope = {group for doc_kind, group in self._groups if doc_kind == kind} | set(groups)
+        for group in scope:
+            records = groups.get(group, ())
+            indexed = self._groups.get((kind, group), 0)
+            for position, record in enumerate(records):
+                key = (kind, group, position)
+                old = self._docs.get(key)
+                if old is record or (old is not None and old == record):
+                    continue
+                self._docs[key] = record
+                self.index.add(key, self._text(kind, group, record))
+                self.reindexed += 1
+            for position in range(len(records), indexed):
+                key = (kind, group, position)
+                del self._docs[key]
+                self.index.remove(key)
+            if records:
+                self._groups[(kind, group)] = len(records)
+            else:
+                self._groups.pop((kind, group), None)
+
+    @staticmethod
+    def _text(kind: str, group: Hashable, record: Any) -> str:
+        """Text a document is indexed under."""
+        if kind == "story":
+            tags = " ".join(record.tags or [])
+            return f"{record.id} {record.title} {tags} {record.assignee or 'unassigned'} {record.status} {group}"
+        if kind == "update":
+            # "blockers" itself is indexed, so questions about blockers find updates that have them
+            blocked = "blockers" if record.blockers else ""
+            return " ".join([record.member_id, record.mood, blocked, *record.blockers, *record.achievements,
+                             record.comments or ""])
+        return " ".join([record.member_id, record.agent_type, *record.flags, *record.recommendations])
+
+    # ==== Retrieval ====
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K, today: Optional[date] = None) -> List[SearchHit]:
+        """The `k` records most relevant to `query`, as context lines."""
+        reference_day = (today or date.today()).toordinal()
+        with self._lock:
+            hits = [(key, score, self._docs[key]) for key, score in self.index.search(query, k)]
+        return [SearchHit(key[0], score, self._line(key, record, reference_day)) for key, score, record in hits]
+
+    @staticmethod
+    def _line(key: Key, record: Any, reference_day: int) -> str:
+        kind, group, _ = key
+        if kind == "story":
+            return f"{SystemContextGenerator.story_line(record, reference_day)} | sprint: {group}"
+        if kind == "update":
+            return f"{SystemContextGenerator.update_line(record)} | date: {record.date}"
+        return f"- {record.member_id} [{record.agent_type}, {record.risk} risk]: {'; '.join(record.flags)}"
+
+    def context(self, query: str, k: int = DEFAULT_TOP_K, today: Optional[date] = None) -> Optional[str]:
+        """Prompt block with the records most relevant to `query`, or None if nothing matches."""
+        hits = self.search(query, k, today)
+        if not hits:
+            return None
+        return "RECORDS RELEVANT TO THIS QUESTION:\n" + "\n".join(hit.line for hit in hits)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"documents": len(self.index), "terms": len(self.index.postings),
+                    "reindexed": self.reindexed, "version": self.version}
@@ -0,0 +1,125 @@
+"""
+Weighted keyword lexicon for standup text.
+
+The lexicon is compiled once into a single case-insensitive regex, factored into a
+prefix trie so it stays fast with thousands of terms. Terms match on word boundaries,
+so "tired" matches "Tired today" but not "untired", and multi-word terms match across
+any whitespace. Many texts are scored in one regex pass over their concatenation.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Term -> weight; negative weights mark negative sentiment
+DEFAULT_WEIGHTS = {
+    "overwhelmed": -1.0,
+    "tired": -1.0,
+    "stressed": -1.0,
+    "frustrated": -1.0,
+}
+
+_SEPARATOR = "\0"      # Joins texts for a batch scan; not whitespace, so no term spans two texts
+
+
+def _trie_pattern(terms: Sequence[str]) -> str:
+    """Regex alternation of `terms` factored into a prefix trie.
+
+    Shared prefixes are tried once instead of once per term, which keeps matching
+    fast with thousands of terms. Longer terms are preferred ("burned out" over "burned").
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}       # End of a term
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = []
+        for char, child in node.items():
+            if char:
+                escaped = r"\s+" if char == " " else re.escape(char)
+                branches.append(escaped + build(child))
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A term may end here: make the longer continuations optional
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+
+@dataclass
+class SentimentScore:
+    score: float = 0.0
+    hits: Dict[str, int] = field(default_factory=dict)      # Term -> occurrences
+    negative: bool = False                                  # Any negative-weight term matched
+
+
+class SentimentLexicon:
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        self.weights = {self._normalize(term): weight for term, weight in weights.items() if term.strip()}
+        self.pattern = None
+        if self.weights:
+            # Terms must not start or end inside a word, so "tired" doesn't match "untired"
+            self.pattern = re.compile(rf"(?<!\w)(?:{_trie_pattern(self.weights)})(?!\w)", re.IGNORECASE)
+
+    @staticmethod
+    def _normalize(term: str) -> str:
+        return " ".join(term.lower().split())
+
+    def _scan(self, texts: Sequence[Optional[str]]) -> Iterator[Tuple[int, str]]:
+        """(text index, term) for every match, in a single pass over all texts."""
+        if self.pattern is None or not texts:
+            return
+        joined = _SEPARATOR.join(text or "" for text in texts)
+        ends, position = [], -1
+        for text in texts:
+            position += len(text or "") + len(_SEPARATOR)
+            ends.append(position)      # Offset of the separator after each text
+        canonical = {}                 # Matched text -> lexicon term, e.g. "Burned  out" -> "burned out"
+        index = 0
+        for match in self.pattern.finditer(joined):
+            # Matches come in order, so the owning text only ever moves forward
+            while match.start() > ends[index]:
+                index += 1
+            found = match.group()
+            term = canonical.get(found)
+            if term is None:
+                term = canonical[found] = self._normalize(found)
+            yield index, term
+
+    def score(self, text: Optional[str]) -> SentimentScore:
+        return self.score_many([text])[0]
+
+    def score_many(self, texts: Sequence[Optional[str]]) -> List[SentimentScore]:
+        scores = [SentimentScore() for _ in texts]
+        for index, term in self._scan(texts):
+            result = scores[index]
+            weight = self.weights[term]
+            result.score += weight
+            result.hits[term] = result.hits.get(term, 0) + 1
+            result.negative = result.negative or weight < 0
+        return scores
+
+    def negative_mask(self, texts: Sequence[Optional[str]]) -> np.ndarray:
+        """Which texts contain at least one negative-weight term."""
+        mask = np.zeros(len(texts), dtype=bool)
+        for index, term in self._scan(texts):
+            if self.weights[term] < 0:
+                mask[index] = True
+        return mask
+
+    def term_counts(self, texts: Sequence[Optional[str]]) -> Dict[str, int]:
+        """Occurrences of each term across all texts."""
+        counts = {}
+        for _, term in self._scan(texts):
+            counts[term] = counts.get(term, 0) + 1
+        return counts
+
+
+DEFAULT_LEXICON = SentimentLexicon()
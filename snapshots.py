@@ -0,0 +1,301 @@
+"""
+Binary snapshot format for PulseBoard data.
+
+Layout (little-endian):
+    header     magic "PBSNAP\0\0", format version (u16), section count (u16), reserved (u32)
+    directory  one entry per section: kind (u16), reserved (u16), record count (u32),
+               byte offset (u64), byte length (u64)
+    sections   fixed-width records that refer to strings by index into a shared,
+               deduplicated string table; variable-length lists (tags, blockers,
+               achievements) are runs of string indices in a list section.
+
+Every record has a fixed size, so readers can memory-map the file and decode a
+section only when it is first accessed.
+"""
+
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Sequence
+
+from columnar import StoryColumns
+from data_models import DailyUpdate, GoalData, SprintStatus, WorkloadData
+
+SNAPSHOT_MAGIC = b"PBSNAP\0\0"
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct("<8sHHI")
+_DIRECTORY_ENTRY = struct.Struct("<HHIQQ")
+
+# Section kinds
+_STRINGS = 1
+_STRING_LISTS = 2
+_SPRINTS = 3
+_STORIES = 4
+_DAILY_UPDATES = 5
+_WORKLOAD = 6
+_GOALS = 7
+
+_NONE = 0xFFFFFFFF            # String index / list start meaning "None"
+_NO_POINTS = -2 ** 31         # Story points sentinel meaning "None"
+
+_SPRINT = struct.Struct("<3I6i2I")      # name, start, end | metrics | first story, story count
+_STORY = struct.Struct("<5IiII")        # id, title, assignee, start, status | points | tags start, tags count
+_UPDATE = struct.Struct("<4Ii4I")       # member, date, mood, comments | hours | blockers, achievements
+_WORKLOAD_RECORD = struct.Struct("<I6i")
+_GOAL = struct.Struct("<Iiidid")         # member | goals, completed | velocity | story points | expected
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is malformed or written by an unsupported version."""
+
+
+class _StringTable:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NONE
+        idx = self.index.get(value)
+        if idx is None:
+            idx = self.index[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+    def encode(self) -> bytes:
+        blobs = [value.encode("utf-8") for value in self.values]
+        offsets = [0]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(blobs)
+
+
+def write_snapshot(
+    path: str,
+    sprints: Optional[Sequence[SprintStatus]] = None,
+    daily_updates: Optional[Sequence[DailyUpdate]] = None,
+    workload_data: Optional[Sequence[WorkloadData]] = None,
+    goal_data: Optional[Sequence[GoalData]] = None
+) -> None:
+    """Write the given collections to `path` atomically. Collections left as None are omitted."""
+    strings = _StringTable()
+    string_lists: List[int] = []
+
+    def add_list(values: Optional[List[str]]):
+        if values is None:
+            return _NONE, 0
+        start = len(string_lists)
+        string_lists.extend(strings.add(value) for value in values)
+        return start, len(values)
+
+    sections = []  # (kind, count, payload)
+
+    if sprints is not None:
+        sprint_records, story_records = [], []
+        for sprint in sprints:
+            first_story = len(story_records)
+            for story in sprint.user_stories:
+                tags_start, tags_count = add_list(story.tags)
+                story_records.append(_STORY.pack(
+                    strings.add(story.id), strings.add(story.title), strings.add(story.assignee),
+                    strings.add(story.start_date), strings.add(story.status),
+                    _NO_POINTS if story.story_points is None else story.story_points,
+                    tags_start, tags_count
+                ))
+            sprint_records.append(_SPRINT.pack(
+                strings.add(sprint.sprint_name), strings.add(sprint.start_date), strings.add(sprint.end_date),
+                sprint.completion, sprint.target, sprint.critical_bugs, sprint.unassigned_stories,
+                sprint.velocity, sprint.planned_velocity,
+                first_story, len(sprint.user_stories)
+            ))
+        sections.append((_SPRINTS, len(sprint_records), b"".join(sprint_records)))
+        sections.append((_STORIES, len(story_records), b"".join(story_records)))
+
+    if daily_updates is not None:
+        records = []
+        for update in daily_updates:
+            blockers_start, blockers_count = add_list(update.blockers)
+            achievements_start, achievements_count = add_list(update.achievements)
+            records.append(_UPDATE.pack(
+                strings.add(update.member_id), strings.add(update.date), strings.add(update.mood),
+                strings.add(update.comments), update.working_hours,
+                blockers_start, blockers_count, achievements_start, achievements_count
+            ))
+        sections.append((_DAILY_UPDATES, len(records), b"".join(records)))
+
+    if workload_data is not None:
+        records = [
+            _WORKLOAD_RECORD.pack(strings.add(w.member_id), w.active_tasks, w.completed_tasks, w.sla_breaches,
+                                  w.overtime_hours, w.code_commits, w.pull_requests)
+            for w in workload_data
+        ]
+        sections.append((_WORKLOAD, len(records), b"".join(records)))
+
+    if goal_data is not None:
+        records = [
+            _GOAL.pack(strings.add(g.member_id), g.sprint_goals, g.completed_goals, float(g.velocity),
+                       g.story_points, float(g.expected_completion))
+            for g in goal_data
+        ]
+        sections.append((_GOALS, len(records), b"".join(records)))
+
+    sections.insert(0, (_STRING_LISTS, len(string_lists), struct.pack(f"<{len(string_lists)}I", *string_lists)))
+    sections.insert(0, (_STRINGS, len(strings.values), strings.encode()))
+
+    offset = _HEADER.size + _DIRECTORY_ENTRY.size * len(sections)
+    directory = []
+    for kind, count, payload in sections:
+        directory.append(_DIRECTORY_ENTRY.pack(kind, 0, count, offset, len(payload)))
+        offset += len(payload)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(sections), 0))
+        f.write(b"".join(directory))
+        for _, _, payload in sections:
+            f.write(payload)
+    os.replace(tmp_path, path)
+
+
+class SnapshotReader:
+    """Memory-mapped snapshot reader; each section is decoded on first access and then kept."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # Empty file
+                raise SnapshotError(f"{path} is not a PulseBoard snapshot") from e
+
+        if len(self._buffer) < _HEADER.size:
+            raise SnapshotError(f"{path} is not a PulseBoard snapshot")
+        magic, version, section_count, _ = _HEADER.unpack_from(self._buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"{path} is not a PulseBoard snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"{path} has snapshot version {version}; only {SNAPSHOT_VERSION} is supported")
+        self.version = version
+
+        self._sections: Dict[int, tuple] = {}
+        for i in range(section_count):
+            kind, _, count, offset, length = _DIRECTORY_ENTRY.unpack_from(
+                self._buffer, _HEADER.size + i * _DIRECTORY_ENTRY.size)
+            if offset + length > len(self._buffer):
+                raise SnapshotError(f"{path} is truncated")
+            self._sections[kind] = (count, offset, length)
+
+        self._strings: Optional[List[Optional[str]]] = None
+        self._string_lists: Optional[tuple] = None
+        self._decoded: Dict[int, list] = {}
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _string(self, idx: int) -> Optional[str]:
+        if idx == _NONE:
+            return None
+        if self._strings is None:
+            # One pass over the whole table is much cheaper than decoding string by string
+            count, offset, length = self._sections[_STRINGS]
+            offsets = struct.unpack_from(f"<{count + 1}I", self._buffer, offset)
+            blob_start = offset + (count + 1) * 4
+            blob = self._buffer[blob_start:offset + length]
+            self._strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)]
+        return self._strings[idx]
+
+    def _string_list(self, start: int, count: int) -> Optional[List[str]]:
+        if start == _NONE:
+            return None
+        if self._string_lists is None:
+            list_count, offset, _ = self._sections[_STRING_LISTS]
+            self._string_lists = struct.unpack_from(f"<{list_count}I", self._buffer, offset)
+        return [self._string(idx) for idx in self._string_lists[start:start + count]]
+
+    def _records(self, kind: int, record: struct.Struct, first: int = 0, count: Optional[int] = None):
+        """Records [first, first + count) of a section (all of them by default)."""
+        total, offset, _ = self._sections[kind]
+        count = total - first if count is None else count
+        start = offset + first * record.size
+        return record.iter_unpack(self._buffer[start:start + count * record.size])
+
+    @property
+    def sprints(self) -> Optional[List[SprintStatus]]:
+        if _SPRINTS not in self._sections:
+            return None
+        if _SPRINTS not in self._decoded:
+            # Stories go straight into one column store per sprint, without UserStory objects
+            def story_columns(first: int, count: int) -> StoryColumns:
+                columns = StoryColumns()
+                for id_, title, assignee, start, status, points, tags_start, tags_count \
+                        in self._records(_STORIES, _STORY, first, count):
+                    columns.append_fields(
+                        self._string(id_), self._string(title), self._string(assignee), self._string(start),
+                        self._string(status), None if points == _NO_POINTS else points,
+                        self._string_list(tags_start, tags_count))
+                return columns
+
+            self._decoded[_SPRINTS] = [
+                SprintStatus(
+                    sprint_name=self._string(name),
+                    start_date=self._string(start),
+                    end_date=self._string(end),
+                    completion=completion,
+                    target=target,
+                    critical_bugs=critical_bugs,
+                    unassigned_stories=unassigned,
+                    velocity=velocity,
+                    planned_velocity=planned_velocity,
+                    user_stories=story_columns(first_story, story_count)
+                )
+                for (name, start, end, completion, target, critical_bugs, unassigned, velocity,
+                     planned_velocity, first_story, story_count) in self._records(_SPRINTS, _SPRINT)
+            ]
+        return self._decoded[_SPRINTS]
+
+    @property
+    def daily_updates(self) -> Optional[List[DailyUpdate]]:
+        if _DAILY_UPDATES not in self._sections:
+            return None
+        if _DAILY_UPDATES not in self._decoded:
+            self._decoded[_DAILY_UPDATES] = [
+                DailyUpdate(
+                    self._string(member), self._string(date), self._string(mood),
+                    self._string_list(blockers_start, blockers_count),
+                    self._string_list(achievements_start, achievements_count),
+                    self._string(comments), hours
+                )
+                for (member, date, mood, comments, hours, blockers_start, blockers_count,
+                     achievements_start, achievements_count) in self._records(_DAILY_UPDATES, _UPDATE)
+            ]
+        return self._decoded[_DAILY_UPDATES]
+
+    @property
+    def workload_data(self) -> Optional[List[WorkloadData]]:
+        if _WORKLOAD not in self._sections:
+            return None
+        if _WORKLOAD not in self._decoded:
+            self._decoded[_WORKLOAD] = [
+                WorkloadData(self._string(member), *values)
+                for member, *values in self._records(_WORKLOAD, _WORKLOAD_RECORD)
+            ]
+        return self._decoded[_WORKLOAD]
+
+    @property
+    def goal_data(self) -> Optional[List[GoalData]]:
+        if _GOALS not in self._sections:
+            return None
+        if _GOALS not in self._decoded:
+            self._decoded[_GOALS] = [
+                GoalData(self._string(member), *values)
+                for member, *values in self._records(_GOALS, _GOAL)
+            ]
+        return self._decoded[_GOALS]
@@ -0,0 +1,119 @@
+"""
+Monte Carlo forecast of when the current sprint's remaining story points get done.
+
+Each trial draws a daily burn rate from the history (previous sprints' velocity per
+sprint day, plus the current sprint's burn rate so far) and simulates day-to-day
+throughput around it. All trials run at once as NumPy arrays; the result is the
+distribution of the day the remaining points are done and of the points done by the
+sprint's end date.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Sequence
+
+import numpy as np
+
+from columnar import NO_POINTS, StoryColumns
+from data_models import DONE_STATUSES, MISSING_DAY, SprintStatus, ordinal_to_date
+
+DEFAULT_TRIALS = 20000
+DAILY_NOISE_SHAPE = 4.0      # Gamma shape of day-to-day throughput around a trial's rate (mean 1)
+
+
+@dataclass
+class SprintForecast:
+    sprint_name: str
+    trials: int
+    total_points: float
+    remaining_points: float
+    days_left: int
+    on_time_probability: float           # Share of trials done by the end date
+    finish_p50: Optional[str]            # Finish dates; None when beyond the simulated horizon
+    finish_p85: Optional[str]
+    end_points_p10: float                # Points done by the end date
+    end_points_p50: float
+    end_points_p90: float
+
+    @property
+    def end_completion_p50(self) -> float:
+        """Median completion (%) at the end date."""
+        return 100.0 * self.end_points_p50 / self.total_points if self.total_points else 100.0
+
+
+class SprintForecaster:
+    @staticmethod
+    def _sprint_days(sprint: SprintStatus) -> Optional[int]:
+        start, end = sprint.start_day, sprint.end_day
+        if start == MISSING_DAY or end == MISSING_DAY or end <= start:
+            return None
+        return end - start
+
+    @staticmethod
+    def forecast(sprints: Sequence[SprintStatus], today: Optional[date] = None,
+                 trials: int = DEFAULT_TRIALS, seed: int = 0) -> Optional[SprintForecast]:
+        """Forecast the last sprint of `sprints`, using the ones before it as history.
+
+        Returns None when the sprint has no usable dates or no rate can be estimated.
+        The default seed keeps the forecast identical for identical data.
+        """
+        if not sprints:
+            return None
+        current = sprints[-1]
+        length = SprintForecaster._sprint_days(current)
+        if length is None:
+            return None
+        today = (today or date.today()).toordinal()
+        start, end = current.start_day, current.end_day
+        elapsed = min(max(today - start, 0), length)
+        days_left = max(end - max(today, start), 0)
+
+        # Stories without an estimate count as the sprint's average estimate
+        stories = StoryColumns.of(current.user_stories)
+        points = stories.column("story_points")
+        estimated = points != NO_POINTS
+        default_points = float(np.mean(points[estimated])) if estimated.any() else 0.0
+        sizes = np.where(estimated, points, default_points).astype(np.float64)
+        done = stories.status_mask(*DONE_STATUSES, ignore_case=True)
+        total = float(sizes.sum())
+        done_points = float(sizes[done].sum())
+        remaining = total - done_points
+
+        # Daily burn rates to draw from: each previous sprint's, plus this sprint's so far
+        rates = []
+        for sprint in sprints[:-1]:
+            sprint_length = SprintForecaster._sprint_days(sprint)
+            if sprint_length:
+                rates.append(sprint.velocity / sprint_length)
+        if elapsed > 0:
+            rates.append(done_points / elapsed)
+        rates = np.array([rate for rate in rates if rate > 0], dtype=np.float64)
+
+        if remaining <= 0 or days_left == 0 or not len(rates):
+            finished = remaining <= 0
+            finish = ordinal_to_date(min(today, end)) if finished else None
+            return SprintForecast(
+                current.sprint_name, 0, total, max(remaining, 0.0), days_left,
+                1.0 if finished else 0.0, finish, finish, done_points, done_points, done_points
+            )
+
+        rng = np.random.default_rng(seed)
+        horizon = days_left + length         # Simulate up to one more sprint length past the end date
+        trial_rates = rng.choice(rates, size=trials).astype(np.float32) / DAILY_NOISE_SHAPE
+        noise = rng.standard_gamma(DAILY_NOISE_SHAPE, size=(trials, horizon), dtype=np.float32)
+        burned = np.cumsum(noise * trial_rates[:, None], axis=1)
+
+        finished = burned[:, -1] >= remaining
+        finish_day = np.where(finished, np.argmax(burned >= remaining, axis=1) + 1, horizon + 1)
+        end_points = done_points + np.minimum(burned[:, days_left - 1], remaining).astype(np.float64)
+        on_time = float(np.mean(finish_day <= days_left))
+
+        def finish_date(q: float) -> Optional[str]:
+            day = int(np.ceil(np.percentile(finish_day, q)))
+            return ordinal_to_date(max(today, start) + day) if day <= horizon else None
+
+        p10, p50, p90 = np.percentile(end_points, [10, 50, 90])
+        return SprintForecast(
+            current.sprint_name, trials, total, remaining, days_left, on_time,
+            finish_date(50), finish_date(85), float(p10), float(p50), float(p90)
+        )
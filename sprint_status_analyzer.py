@@ -1,85 +1,143 @@
-from typing import List
-from data_models import SprintStatus, AnalysisResult, UserStory
-from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+import numpy as np
+from columnar import StoryColumns
+from data_models import MISSING_DAY, SprintStatus, AnalysisResult, UserStory
+from datetime import date
+from sprint_forecaster import SprintForecast, SprintForecaster
+from trend_engine import SprintTrend, TrendEngine
+
+STUCK_DAYS = 5               # Days in progress after which a story counts as stuck
+FORECAST_AT_RISK = 0.5       # On-time probability below which the sprint is flagged
+FORECAST_CRITICAL = 0.2
+
+# (metric, direction that is bad: -1 low / 1 high, flag label, recommendation)
+TREND_ANOMALIES = [
+    ("velocity", -1, "Velocity anomaly", "Check for absences, disruptions or scope changes"),
+    ("completion", -1, "Completion anomaly", "Review sprint scope against recent sprints"),
+    ("critical_bugs", 1, "Critical bug spike", "Review recent changes for quality regressions"),
+]
 
 class SprintStatusAnalyzer:
     @staticmethod
-    def analyze(sprints: List[SprintStatus]) -> List[AnalysisResult]:
+    def analyze(sprints: Sequence[SprintStatus], start: int = 0,
+                forecast: Optional[SprintForecast] = None, today: Optional[date] = None,
+                trends: Optional[TrendEngine] = None) -> List[AnalysisResult]:
+        """Analyze sprints[start:]; earlier sprints only feed the trend history.
+
+        The last sprint also gets forecast flags (`forecast` is computed if not given).
+        Story ages are counted up to `today` (the current date by default).
+        `trends` holds the history of sprints[:start] (built from them if not given) and
+        is advanced in place up to, but not including, the current sprint.
+        """
+        today = today or date.today()
+        if forecast is None and sprints:
+            forecast = SprintForecaster.forecast(sprints, today)
+        if trends is None:
+            trends = TrendEngine.from_sprints(sprints[:start])
         results = []
+        for i in range(start, len(sprints)):
+            is_current = i == len(sprints) - 1
+            trend = trends.observe(sprints[i]) if is_current else trends.append(sprints[i])
+            results.append(SprintStatusAnalyzer.analyze_sprint(
+                sprints[i], trend, forecast if is_current else None, today))
+        return results
 
-        for i, sprint in enumerate(sprints):
-            flags = []
-            recommendations = []
-            risk = "low"
+    @staticmethod
+    def analyze_sprint(sprint: SprintStatus, trend: Optional[SprintTrend] = None,
+                       forecast: Optional[SprintForecast] = None, today: Optional[date] = None) -> AnalysisResult:
+        """Analyze one sprint; `trend` compares it with the sprints before it."""
+        # Stories started on or before this day have been in progress for STUCK_DAYS or more
+        stuck_before = (today or date.today()).toordinal() - STUCK_DAYS
+        flags = []
+        recommendations = []
+        risk = "low"
 
-            # Basic checks
-            if sprint.completion < sprint.target * 0.6:
-                flags.append(f"[{sprint.sprint_name}] Low progress: {sprint.completion}% vs target {sprint.target}%")
-                recommendations.append("Investigate delays and reallocate resources")
+        # Basic checks
+        if sprint.completion < sprint.target * 0.6:
+            flags.append(f"[{sprint.sprint_name}] Low progress: {sprint.completion}% vs target {sprint.target}%")
+            recommendations.append("Investigate delays and reallocate resources")
+            risk = "medium"
+
+        if sprint.critical_bugs >= 3:
+            flags.append(f"[{sprint.sprint_name}] {sprint.critical_bugs} critical bugs unresolved")
+            recommendations.append("Prioritize fixing critical bugs")
+            risk = "high"
+
+        if sprint.velocity < sprint.planned_velocity * 0.5:
+            flags.append(f"[{sprint.sprint_name}] Low velocity: {sprint.velocity} / {sprint.planned_velocity}")
+            recommendations.append("Review capacity and scope creep")
+            if risk != "high":
                 risk = "medium"
 
-            if sprint.critical_bugs >= 3:
-                flags.append(f"[{sprint.sprint_name}] {sprint.critical_bugs} critical bugs unresolved")
-                recommendations.append("Prioritize fixing critical bugs")
-                risk = "high"
+        # User Story Analysis, scanning the story columns
+        stories = StoryColumns.of(sprint.user_stories)
+        start_day = stories.column("start_day")
+        in_progress = stories.status_mask("in progress")
+        unassigned = stories.assignee_mask(None, "")
 
-            if sprint.velocity < sprint.planned_velocity * 0.5:
-                flags.append(f"[{sprint.sprint_name}] Low velocity: {sprint.velocity} / {sprint.planned_velocity}")
-                recommendations.append("Review capacity and scope creep")
-                if risk != "high":
-                    risk = "medium"
-
-            # User Story Analysis
-            unassigned = [us for us in sprint.user_stories if not us.assignee]
-            stuck_stories = []
-            overloaded_members = {}
-
-            for us in sprint.user_stories:
-                if us.status == "in progress":
-                    try:
-                        start_date = datetime.strptime(us.start_date, "%Y-%m-%d")
-                        if start_date < datetime.today() - timedelta(days=5):
-                            stuck_stories.append(us)
-                    except Exception:
-                        flags.append(f"[{sprint.sprint_name}] Invalid or missing start date in story {us.id}")
-                        recommendations.append(f"Check start date of {us.id}")
-                        risk = "medium"
+        for i in np.flatnonzero(in_progress & (start_day == MISSING_DAY)):
+            flags.append(f"[{sprint.sprint_name}] Invalid or missing start date in story {stories.ids[i]}")
+            recommendations.append(f"Check start date of {stories.ids[i]}")
+            risk = "medium"
+        stuck = np.flatnonzero(in_progress & (start_day != MISSING_DAY) & (start_day <= stuck_before))
 
-                if us.assignee:
-                    overloaded_members[us.assignee] = overloaded_members.get(us.assignee, 0) + 1
+        if unassigned.any():
+            flags.append(f"[{sprint.sprint_name}] {int(unassigned.sum())} stories unassigned")
+            recommendations.append("Assign all unclaimed stories")
+            if risk != "high":
+                risk = "medium"
 
-            if unassigned:
-                flags.append(f"[{sprint.sprint_name}] {len(unassigned)} stories unassigned")
-                recommendations.append("Assign all unclaimed stories")
-                if risk != "high":
-                    risk = "medium"
+        if len(stuck):
+            stuck_ids = ', '.join(stories.ids[i] for i in stuck)
+            flags.append(f"[{sprint.sprint_name}] Stuck stories: {stuck_ids}")
+            recommendations.append("Follow up on long-running tasks")
+            risk = "high"
 
-            if stuck_stories:
-                stuck_ids = ', '.join(us.id for us in stuck_stories)
-                flags.append(f"[{sprint.sprint_name}] Stuck stories: {stuck_ids}")
-                recommendations.append("Follow up on long-running tasks")
-                risk = "high"
+        # Assignee codes are numbered in order of first appearance, like the members listed here
+        story_counts = np.bincount(stories.column("assignee")[~unassigned], minlength=len(stories.assignees))
+        overloaded = [stories.assignees.values[code] for code in np.flatnonzero(story_counts > 3)]
+        if overloaded:
+            flags.append(f"[{sprint.sprint_name}] Overloaded members: {', '.join(overloaded)}")
+            recommendations.append("Balance workload across team")
+            if risk != "high":
+                risk = "medium"
 
-            overloaded = [member for member, count in overloaded_members.items() if count > 3]
-            if overloaded:
-                flags.append(f"[{sprint.sprint_name}] Overloaded members: {', '.join(overloaded)}")
-                recommendations.append("Balance workload across team")
-                if risk != "high":
-                    risk = "medium"
-
-            # Compare with previous sprint if available
-            if i > 0:
-                prev = sprints[i - 1]
-                if sprint.velocity < prev.velocity:
-                    flags.append(f"[{sprint.sprint_name}] Velocity dropped vs {prev.sprint_name}")
-                    recommendations.append("Investigate root cause of velocity drop")
-
-            results.append(AnalysisResult(
-                agent_type="sprint",
-                member_id="team",
-                risk=risk,
-                flags=flags,
-                recommendations=recommendations
-            ))
+        # Compare with previous sprints if available
+        if trend is not None:
+            velocity = trend.metrics["velocity"]
+            if velocity.previous is not None and velocity.value < velocity.previous:
+                flags.append(f"[{sprint.sprint_name}] Velocity dropped vs {trend.previous_sprint}")
+                recommendations.append("Investigate root cause of velocity drop")
 
-        return results
+            for metric, direction, label, recommendation in TREND_ANOMALIES:
+                history = trend.metrics[metric]
+                if history.is_anomaly(direction):
+                    flags.append(
+                        f"[{sprint.sprint_name}] {label}: {history.value} vs rolling mean {history.mean:.1f} "
+                        f"over {history.history} sprints (z={history.zscore:+.1f})"
+                    )
+                    recommendations.append(recommendation)
+                    if risk != "high":
+                        risk = "medium"
+
+        # Forecast of the remaining work, for a sprint that is still running
+        if forecast is not None and forecast.days_left > 0 and forecast.remaining_points > 0 \
+                and forecast.on_time_probability < FORECAST_AT_RISK:
+            finish = f"by {forecast.finish_p85}" if forecast.finish_p85 else "beyond the forecast horizon"
+            flags.append(
+                f"[{sprint.sprint_name}] Forecast: {forecast.on_time_probability:.0%} chance to finish "
+                f"{forecast.remaining_points:g} remaining points by {sprint.end_date} (85% finish {finish})"
+            )
+            recommendations.append("Cut or re-plan scope with the team now")
+            if forecast.on_time_probability < FORECAST_CRITICAL:
+                risk = "high"
+            elif risk != "high":
+                risk = "medium"
+
+        return AnalysisResult(
+            agent_type="sprint",
+            member_id="team",
+            risk=risk,
+            flags=flags,
+            recommendations=recommendations
+        )
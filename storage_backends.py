@@ -0,0 +1,353 @@
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+
+from data_models import DONE_STATUSES, DailyUpdate, GoalData, SprintStatus, UserStory, WorkloadData
+
+
+def _window_start(dates: Iterable[Optional[str]], days: int) -> Optional[str]:
+    """First YYYY-MM-DD date of the `days`-day window ending at the newest of `dates`."""
+    newest = max((d for d in dates if d), default=None)
+    if newest is None:
+        return None
+    return (date.fromisoformat(newest[:10]) - timedelta(days=days - 1)).isoformat()
+
+
+class StorageBackend(ABC):
+    """Where DataStore keeps its collections, with indexed queries over the full history.
+
+    Loads can be limited to recent data (the latest sprints, the last days of updates),
+    and saves merge into what is stored instead of replacing it, so the backend can hold
+    far more history than DataStore keeps in memory.
+    """
+
+    @abstractmethod
+    def load_sprints(self, limit: Optional[int] = None) -> List[SprintStatus]:
+        """The last `limit` sprints (all by default), oldest first."""
+
+    @abstractmethod
+    def load_daily_updates(self, days: Optional[int] = None) -> List[DailyUpdate]:
+        """Updates of the last `days` days up to the newest update (all by default)."""
+
+    @abstractmethod
+    def load_workload_data(self) -> List[WorkloadData]:
+        ...
+
+    @abstractmethod
+    def load_goal_data(self) -> List[GoalData]:
+        ...
+
+    @abstractmethod
+    def save_sprints(self, sprints: List[SprintStatus]):
+        """Store sprints, replacing stored sprints of the same name; other sprints are kept."""
+
+    @abstractmethod
+    def save_daily_updates(self, daily_updates: List[DailyUpdate]):
+        """Replace the stored updates dated on or after the earliest date in `daily_updates`.
+
+        An empty list removes every update.
+        """
+
+    @abstractmethod
+    def save_workload_data(self, workload_data: List[WorkloadData]):
+        ...
+
+    @abstractmethod
+    def save_goal_data(self, goal_data: List[GoalData]):
+        ...
+
+    @abstractmethod
+    def stories_by_assignee(self, assignee: str) -> List[UserStory]:
+        ...
+
+    @abstractmethod
+    def updates_by_member(self, member_id: str, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> List[DailyUpdate]:
+        """Updates of one member, optionally limited to an inclusive YYYY-MM-DD range."""
+
+    @abstractmethod
+    def open_stories(self, sprint_name: str) -> List[UserStory]:
+        """Stories of a sprint that are not done yet."""
+
+
+class InMemoryBackend(StorageBackend):
+    """Plain Python lists; the default backend."""
+
+    def __init__(self, sprints: List[SprintStatus] = None, daily_updates: List[DailyUpdate] = None,
+                 workload_data: List[WorkloadData] = None, goal_data: List[GoalData] = None):
+        self.sprints = list(sprints or [])
+        self.daily_updates = list(daily_updates or [])
+        self.workload_data = list(workload_data or [])
+        self.goal_data = list(goal_data or [])
+
+    def load_sprints(self, limit: Optional[int] = None) -> List[SprintStatus]:
+        return list(self.sprints[-limit:] if limit else self.sprints)
+
+    def load_daily_updates(self, days: Optional[int] = None) -> List[DailyUpdate]:
+        start = _window_start((u.date for u in self.daily_updates), days) if days else None
+        return [u for u in self.daily_updates if start is None or (u.date or "") >= start]
+
+    def load_workload_data(self) -> List[WorkloadData]:
+        return list(self.workload_data)
+
+    def load_goal_data(self) -> List[GoalData]:
+        return list(self.goal_data)
+
+    def save_sprints(self, sprints: List[SprintStatus]):
+        saved = {sprint.sprint_name: sprint for sprint in sprints}
+        kept = [saved.pop(sprint.sprint_name, sprint) for sprint in self.sprints]
+        self.sprints = kept + [sprint for sprint in sprints if sprint.sprint_name in saved]
+
+    def save_daily_updates(self, daily_updates: List[DailyUpdate]):
+        start = min((u.date or "" for u in daily_updates), default=None)
+        kept = [u for u in self.daily_updates if start is not None and u.date and u.date < start]
+        self.daily_updates = kept + list(daily_updates)
+
+    def save_workload_data(self, workload_data: List[WorkloadData]):
+        self.workload_data = list(workload_data)
+
+    def save_goal_data(self, goal_data: List[GoalData]):
+        self.goal_data = list(goal_data)
+
+    def stories_by_assignee(self, assignee: str) -> List[UserStory]:
+        return [us for sprint in self.sprints for us in sprint.user_stories if us.assignee == assignee]
+
+    def updates_by_member(self, member_id: str, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> List[DailyUpdate]:
+        return [
+            u for u in self.daily_updates
+            if u.member_id == member_id
+            and (start_date is None or u.date >= start_date)
+            and (end_date is None or u.date <= end_date)
+        ]
+
+    def open_stories(self, sprint_name: str) -> List[UserStory]:
+        return [
+            us for sprint in self.sprints if sprint.sprint_name == sprint_name
+            for us in sprint.user_stories if us.status.lower() not in DONE_STATUSES
+        ]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sprints (
+    id INTEGER PRIMARY KEY,
+    sprint_name TEXT NOT NULL,
+    start_date TEXT,
+    end_date TEXT,
+    completion INTEGER,
+    target INTEGER,
+    critical_bugs INTEGER,
+    unassigned_stories INTEGER,
+    velocity INTEGER,
+    planned_velocity INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sprints_name ON sprints (sprint_name);
+
+CREATE TABLE IF NOT EXISTS user_stories (
+    id INTEGER PRIMARY KEY,
+    sprint_id INTEGER NOT NULL REFERENCES sprints (id) ON DELETE CASCADE,
+    story_id TEXT,
+    title TEXT,
+    assignee TEXT,
+    start_date TEXT,
+    status TEXT,
+    story_points INTEGER,
+    tags TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_stories_assignee ON user_stories (assignee);
+CREATE INDEX IF NOT EXISTS idx_stories_sprint_status ON user_stories (sprint_id, status);
+
+CREATE TABLE IF NOT EXISTS daily_updates (
+    id INTEGER PRIMARY KEY,
+    member_id TEXT NOT NULL,
+    date TEXT,
+    mood TEXT,
+    blockers TEXT,
+    achievements TEXT,
+    comments TEXT,
+    working_hours INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_updates_member_date ON daily_updates (member_id, date);
+
+CREATE TABLE IF NOT EXISTS workload (
+    id INTEGER PRIMARY KEY,
+    member_id TEXT NOT NULL,
+    active_tasks INTEGER,
+    completed_tasks INTEGER,
+    sla_breaches INTEGER,
+    overtime_hours INTEGER,
+    code_commits INTEGER,
+    pull_requests INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_workload_member ON workload (member_id);
+
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY,
+    member_id TEXT NOT NULL,
+    sprint_goals INTEGER,
+    completed_goals INTEGER,
+    velocity REAL,
+    story_points INTEGER,
+    expected_completion REAL
+);
+CREATE INDEX IF NOT EXISTS idx_goals_member ON goals (member_id);
+"""
+
+_STORY_COLUMNS = "story_id, title, assignee, start_date, status, story_points, tags"
+_UPDATE_COLUMNS = "member_id, date, mood, blockers, achievements, comments, working_hours"
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite storage with indexes by member, sprint and status."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")  # Readers don't block the refresh writer
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _story(row) -> UserStory:
+        story_id, title, assignee, start_date, status, story_points, tags = row
+        return UserStory(story_id, title, assignee, start_date, status, story_points,
+                         json.loads(tags) if tags is not None else None)
+
+    @staticmethod
+    def _update(row) -> DailyUpdate:
+        member_id, date, mood, blockers, achievements, comments, working_hours = row
+        return DailyUpdate(member_id, date, mood, json.loads(blockers), json.loads(achievements),
+                           comments, working_hours)
+
+    def load_sprints(self, limit: Optional[int] = None) -> List[SprintStatus]:
+        sprint_rows = self._query(
+            "SELECT id, sprint_name, start_date, end_date, completion, target, critical_bugs, "
+            "unassigned_stories, velocity, planned_velocity FROM sprints ORDER BY id DESC"
+            + (" LIMIT ?" if limit else ""), (limit,) if limit else ())[::-1]
+        if not sprint_rows:
+            return []
+
+        stories_by_sprint = {}
+        for sprint_id, *row in self._query(
+                f"SELECT sprint_id, {_STORY_COLUMNS} FROM user_stories WHERE sprint_id >= ? ORDER BY id",
+                (sprint_rows[0][0],)):
+            stories_by_sprint.setdefault(sprint_id, []).append(self._story(row))
+
+        return [
+            SprintStatus(name, start_date, end_date, completion, target, critical_bugs, unassigned,
+                         velocity, planned_velocity, stories_by_sprint.get(sprint_id, []))
+            for (sprint_id, name, start_date, end_date, completion, target, critical_bugs, unassigned,
+                 velocity, planned_velocity) in sprint_rows
+        ]
+
+    def load_daily_updates(self, days: Optional[int] = None) -> List[DailyUpdate]:
+        start = None
+        if days:
+            start = _window_start([row[0] for row in self._query("SELECT max(date) FROM daily_updates")], days)
+        if start is None:
+            rows = self._query(f"SELECT {_UPDATE_COLUMNS} FROM daily_updates ORDER BY id")
+        else:
+            rows = self._query(f"SELECT {_UPDATE_COLUMNS} FROM daily_updates WHERE date >= ? ORDER BY id", (start,))
+        return [self._update(row) for row in rows]
+
+    def load_workload_data(self) -> List[WorkloadData]:
+        return [WorkloadData(*row) for row in self._query(
+            "SELECT member_id, active_tasks, completed_tasks, sla_breaches, overtime_hours, code_commits, "
+            "pull_requests FROM workload ORDER BY id")]
+
+    def load_goal_data(self) -> List[GoalData]:
+        return [GoalData(*row) for row in self._query(
+            "SELECT member_id, sprint_goals, completed_goals, velocity, story_points, expected_completion "
+            "FROM goals ORDER BY id")]
+
+    def save_sprints(self, sprints: List[SprintStatus]):
+        with self._lock, self._conn:
+            for sprint in sprints:
+                values = (sprint.start_date, sprint.end_date, sprint.completion, sprint.target, sprint.critical_bugs,
+                          sprint.unassigned_stories, sprint.velocity, sprint.planned_velocity)
+                row = self._conn.execute("SELECT id FROM sprints WHERE sprint_name = ?",
+                                         (sprint.sprint_name,)).fetchone()
+                if row is not None:
+                    # Updated in place, so the sprint keeps its position in the history
+                    sprint_id = row[0]
+                    self._conn.execute(
+                        "UPDATE sprints SET start_date = ?, end_date = ?, completion = ?, target = ?, "
+                        "critical_bugs = ?, unassigned_stories = ?, velocity = ?, planned_velocity = ? "
+                        "WHERE id = ?", (*values, sprint_id))
+                    self._conn.execute("DELETE FROM user_stories WHERE sprint_id = ?", (sprint_id,))
+                else:
+                    sprint_id = self._conn.execute(
+                        "INSERT INTO sprints (sprint_name, start_date, end_date, completion, target, critical_bugs, "
+                        "unassigned_stories, velocity, planned_velocity) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (sprint.sprint_name, *values)).lastrowid
+                # Statuses are stored lowercased so open_stories can compare the indexed column as is
+                self._conn.executemany(
+                    f"INSERT INTO user_stories (sprint_id, {_STORY_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(sprint_id, us.id, us.title, us.assignee, us.start_date,
+                      us.status.lower() if us.status is not None else None, us.story_points,
+                      json.dumps(us.tags) if us.tags is not None else None) for us in sprint.user_stories])
+
+    def save_daily_updates(self, daily_updates: List[DailyUpdate]):
+        start = min((u.date or "" for u in daily_updates), default=None)
+        with self._lock, self._conn:
+            if start is None:
+                self._conn.execute("DELETE FROM daily_updates")
+            else:
+                self._conn.execute("DELETE FROM daily_updates WHERE date >= ? OR date IS NULL", (start,))
+            self._conn.executemany(
+                f"INSERT INTO daily_updates ({_UPDATE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(u.member_id, u.date, u.mood, json.dumps(u.blockers), json.dumps(u.achievements), u.comments,
+                  u.working_hours) for u in daily_updates])
+
+    def save_workload_data(self, workload_data: List[WorkloadData]):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM workload")
+            self._conn.executemany(
+                "INSERT INTO workload (member_id, active_tasks, completed_tasks, sla_breaches, overtime_hours, "
+                "code_commits, pull_requests) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(w.member_id, w.active_tasks, w.completed_tasks, w.sla_breaches, w.overtime_hours,
+                  w.code_commits, w.pull_requests) for w in workload_data])
+
+    def save_goal_data(self, goal_data: List[GoalData]):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM goals")
+            self._conn.executemany(
+                "INSERT INTO goals (member_id, sprint_goals, completed_goals, velocity, story_points, "
+                "expected_completion) VALUES (?, ?, ?, ?, ?, ?)",
+                [(g.member_id, g.sprint_goals, g.completed_goals, g.velocity, g.story_points,
+                  g.expected_completion) for g in goal_data])
+
+    def stories_by_assignee(self, assignee: str) -> List[UserStory]:
+        return [self._story(row) for row in self._query(
+            f"SELECT {_STORY_COLUMNS} FROM user_stories WHERE assignee = ? ORDER BY id", (assignee,))]
+
+    def updates_by_member(self, member_id: str, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> List[DailyUpdate]:
+        sql = f"SELECT {_UPDATE_COLUMNS} FROM daily_updates WHERE member_id = ?"
+        params = [member_id]
+        if start_date is not None:
+            sql += " AND date >= ?"
+            params.append(start_date)
+        if end_date is not None:
+            sql += " AND date <= ?"
+            params.append(end_date)
+        return [self._update(row) for row in self._query(sql + " ORDER BY date, id", tuple(params))]
+
+    def open_stories(self, sprint_name: str) -> List[UserStory]:
+        placeholders = ", ".join("?" for _ in DONE_STATUSES)
+        return [self._story(row) for row in self._query(
+            f"SELECT {', '.join('us.' + c.strip() for c in _STORY_COLUMNS.split(','))} "
+            f"FROM user_stories us JOIN sprints s ON s.id = us.sprint_id "
+            f"WHERE s.sprint_name = ? AND us.status NOT IN ({placeholders}) ORDER BY us.id",
+            (sprint_name, *sorted(DONE_STATUSES)))]
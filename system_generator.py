@@ -1,128 +1,279 @@
-from datetime import datetime
-from typing import List
-from data_models import SprintStatus, DailyUpdate, AnalysisResult, WorkloadData
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from data_models import MISSING_DAY, SprintStatus, DailyUpdate, AnalysisResult, UserStory, WorkloadData
+from sprint_forecaster import SprintForecast, SprintForecaster
+from trend_engine import TrendEngine
+
+CONTEXT_HEADER = "You are AskManager, an AI assistant for sprint and team health management."
+CONTEXT_FOOTER = "Provide concise, actionable advice based on this data. Focus on practical solutions."
+TEAM_HEALTH_KEYS = ("critical", "overloaded", "underutilized", "burnout")
+
 
 class SystemContextGenerator:
+    """Builds the system context one section at a time.
+
+    An instance keeps each section's text next to the inputs it was rendered from and
+    re-renders only the sections whose inputs changed, so unchanged data gives
+    byte-identical text and the prompt prefix stays stable between chat turns.
+    """
+
+    def __init__(self):
+        self._sections: Dict[str, Tuple[Any, str]] = {}
+        self.hits = 0
+        self.rebuilds = 0
+
     @staticmethod
     def generate_context(
         sprints: List[SprintStatus],
         daily_updates: List[DailyUpdate],
         analysis_results: List[AnalysisResult],
         correlation: dict,
-        workload_data: List[WorkloadData]
+        workload_data: List[WorkloadData],
+        forecast: Optional[SprintForecast] = None,
+        today: Optional[date] = None
+    ) -> str:
+        return SystemContextGenerator().build(
+            sprints, daily_updates, analysis_results, correlation, workload_data, forecast, today)
+
+    def build(
+        self,
+        sprints: Sequence[SprintStatus],
+        daily_updates: Sequence[DailyUpdate],
+        analysis_results: Sequence[AnalysisResult],
+        correlation: dict,
+        workload_data: Sequence[WorkloadData],
+        forecast: Optional[SprintForecast] = None,
+        today: Optional[date] = None,
+        trends: Optional[TrendEngine] = None
     ) -> str:
-        today = datetime.today()
+        """`trends` holds the history of every sprint before the current one (built from them if not given)."""
+        today = today or date.today()
 
         if not sprints:
             return "No sprint data available."
 
         current = sprints[-1]
-        previous = sprints[-2] if len(sprints) > 1 else None
+        if forecast is None:
+            forecast = SprintForecaster.forecast(sprints, today)
 
         # === Sprint Flags & Recommendations ===
-        sprint_flags = [res.flags for res in analysis_results if res.agent_type == "sprint"]
-        sprint_recommendations = [res.recommendations for res in analysis_results if res.agent_type == "sprint"]
-        sprint_flags_flat = [f for sub in sprint_flags for f in sub]
-        sprint_recs_flat = [r for sub in sprint_recommendations for r in sub]
-
-        # === SPRINT TREND ANALYSIS ===
-        if previous:
-            velocity_diff = current.velocity - previous.velocity
-            completion_diff = current.completion - previous.completion
-            bug_diff = current.critical_bugs - previous.critical_bugs
-
-            trend_lines = [
-                f"- Velocity changed: {previous.velocity} → {current.velocity} ({'+' if velocity_diff >= 0 else ''}{velocity_diff})",
-                f"- Completion changed: {previous.completion}% → {current.completion}% ({'+' if completion_diff >= 0 else ''}{completion_diff}%)",
-                f"- Critical bugs changed: {previous.critical_bugs} → {current.critical_bugs} ({'+' if bug_diff >= 0 else ''}{bug_diff})"
-            ]
-        else:
-            trend_lines = ["- No previous sprint available for comparison."]
+        sprint_results = [res for res in analysis_results if res.agent_type == "sprint"]
+        sprint_flags = tuple(f for res in sprint_results for f in res.flags)
+        sprint_recs = tuple(r for res in sprint_results for r in res.recommendations)
+        stories = tuple(current.user_stories)
+
+        # Each section is keyed on exactly the data it renders
+        core = self._core_sections(sprints, correlation, forecast, trends)
+        sections = [
+            core["header"],
+            core["sprint_info"],
+            core["trend"],
+            core["forecast"],
+            self._section("findings", sprint_flags,
+                          lambda: self.findings_section(sprint_flags)),
+            self._section("stories", (stories, today),
+                          lambda: self.stories_section(stories, today)),
+            self._section("daily_updates", tuple(daily_updates),
+                          lambda: self.daily_updates_section(daily_updates)),
+            self._section("workload", tuple(workload_data),
+                          lambda: self.workload_section(workload_data)),
+            core["team_health"],
+            self._section("recommendations", sprint_recs + tuple(correlation["recommendations"]),
+                          lambda: self.recommendations_section(sprint_recs + tuple(correlation["recommendations"]))),
+            core["footer"],
+        ]
+        return "\n\n".join(sections)
+
+    def core(
+        self,
+        sprints: Sequence[SprintStatus],
+        correlation: dict,
+        forecast: Optional[SprintForecast] = None,
+        today: Optional[date] = None,
+        trends: Optional[TrendEngine] = None
+    ) -> str:
+        """Context without the item sections (findings, stories, daily updates, workload,
+        recommendations), for prompts that add the records relevant to a question instead.
+
+        Sections come from the same cache as `build`'s, so their text is identical.
+        """
+        if not sprints:
+            return "No sprint data available."
+        if forecast is None:
+            forecast = SprintForecaster.forecast(sprints, today or date.today())
+        return "\n\n".join(self._core_sections(sprints, correlation, forecast, trends).values())
+
+    def _core_sections(self, sprints: Sequence[SprintStatus], correlation: dict,
+                       forecast: Optional[SprintForecast], trends: Optional[TrendEngine]) -> Dict[str, str]:
+        """Sections every context has, in order: header, sprint info, trend, forecast, team health, footer."""
+        current = sprints[-1]
+        return {
+            "header": CONTEXT_HEADER,
+            "sprint_info": self._section("sprint_info", self._sprint_info_key(current),
+                                         lambda: self.sprint_info_section(current)),
+            "trend": self._section("trend", tuple(self._trend_key(sprint) for sprint in sprints),
+                                   lambda: self.trend_section(self._trends(sprints, trends), current)),
+            "forecast": self._section("forecast", (forecast, current.end_date),
+                                      lambda: self.forecast_section(forecast, current.end_date)),
+            "team_health": self._section("team_health", tuple(tuple(correlation[key]) for key in TEAM_HEALTH_KEYS),
+                                         lambda: self.team_health_section(correlation)),
+            "footer": CONTEXT_FOOTER,
+        }
+
+    def _section(self, name: str, key: Any, render: Callable[[], str]) -> str:
+        """Text of a section, rendered again only if its `key` differs from the last build."""
+        cached = self._sections.get(name)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        text = render()
+        self._sections[name] = (key, text)
+        self.rebuilds += 1
+        return text
 
-        # === User Story Details ===
-        user_story_details = []
-        for us in current.user_stories:
-            assignee = us.assignee or "Unassigned"
-            status = us.status
-            try:
-                start = datetime.strptime(us.start_date, "%Y-%m-%d")
-                days_active = (today - start).days
-            except:
-                days_active = "N/A"
-
-            est_days = us.story_points if us.story_points is not None else "?"
-            remaining = (
-                f"{int(est_days) - days_active} days left"
-                if isinstance(days_active, int) and est_days != "?"
-                else "N/A"
-            )
-
-            user_story_details.append(
-                f"- {us.id}: '{us.title}' → {assignee} | status: {status}, started: {us.start_date or 'N/A'}, "
-                f"est: {est_days}d, progress: {days_active}d active, {remaining}"
-            )
-        story_summary = "\n".join(user_story_details)
-
-        # === Daily Update Summary ===
-        daily_update_details = []
-        for update in daily_updates:
-            mood = update.mood.capitalize()
-            blockers = ", ".join(update.blockers) if update.blockers else "None"
-            progress = ", ".join(update.achievements) if update.achievements else "None"
-            comments = update.comments or "No comment"
-            hours = f"{update.working_hours}h"
-
-            daily_update_details.append(
-                f"- {update.member_id}: Mood: {mood} | Hours: {hours} | Blockers: {blockers} | "
-                f"Progress: {progress} | Notes: {comments}"
-            )
-        daily_update_summary = "\n".join(daily_update_details)
-
-        # === Workload Summary Per Member ===
-        workload_summary_lines = []
-        for w in workload_data:
-            workload_summary_lines.append(
-                f"- {w.member_id}: Tasks → active: {w.active_tasks}, completed: {w.completed_tasks} | "
-                f"SLA breaches: {w.sla_breaches} | Overtime: {w.overtime_hours}h | "
-                f"Commits: {w.code_commits}, PRs: {w.pull_requests}"
-            )
-        workload_summary = "\n".join(workload_summary_lines)
-
-        # === Final Context Format ===
-        context = f"""You are AskManager, an AI assistant for sprint and team health management.
-
-SPRINT INFO: "{current.sprint_name}" ({current.start_date} → {current.end_date})
+    def invalidate(self):
+        self._sections.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "rebuilds": self.rebuilds, "sections": len(self._sections)}
+
+    @staticmethod
+    def _trends(sprints: Sequence[SprintStatus], trends: Optional[TrendEngine]) -> TrendEngine:
+        return trends if trends is not None else TrendEngine.from_sprints(sprints[:-1])
+
+    @staticmethod
+    def _sprint_info_key(sprint: SprintStatus) -> tuple:
+        return (sprint.sprint_name, sprint.start_date, sprint.end_date, sprint.completion, sprint.target,
+                sprint.velocity, sprint.planned_velocity, sprint.critical_bugs, sprint.unassigned_stories)
+
+    @staticmethod
+    def _trend_key(sprint: SprintStatus) -> tuple:
+        return (sprint.sprint_name, sprint.velocity, sprint.completion, sprint.critical_bugs)
+
+    # ==== Sections ====
+
+    @staticmethod
+    def sprint_info_section(current: SprintStatus) -> str:
+        return f"""SPRINT INFO: "{current.sprint_name}" ({current.start_date} → {current.end_date})
 - Progress: {current.completion}% complete (target: {current.target}%)
 - Velocity: {current.velocity} SP / {current.planned_velocity} SP
 - Critical bugs: {current.critical_bugs}
-- Unassigned stories: {current.unassigned_stories}
+- Unassigned stories: {current.unassigned_stories}"""
+
+    @staticmethod
+    def trend_section(trends: TrendEngine, current: SprintStatus) -> str:
+        """Trend of `current` against `trends`, the history of the sprints before it."""
+        trend = trends.observe(current)
+        if trend.previous_sprint is not None:
+            trend_lines = []
+            for metric, label, unit in [("velocity", "Velocity", ""), ("completion", "Completion", "%"),
+                                        ("critical_bugs", "Critical bugs", "")]:
+                history = trend.metrics[metric]
+                change = history.change
+                trend_lines.append(
+                    f"- {label} changed: {history.previous}{unit} → {history.value}{unit} "
+                    f"({'+' if change >= 0 else ''}{change}{unit})"
+                )
+                summary = trends.summary(metric)
+                if summary:
+                    trend_lines.append(f"  {label} before this sprint: {summary}")
+        else:
+            trend_lines = ["- No previous sprint available for comparison."]
+        return "SPRINT TREND ANALYSIS:\n" + "\n".join(trend_lines)
 
-SPRINT TREND ANALYSIS:
-{chr(10).join(trend_lines)}
+    @staticmethod
+    def forecast_section(forecast: Optional[SprintForecast], end_date: str) -> str:
+        if forecast is None:
+            forecast_lines = ["- Not enough data to forecast this sprint."]
+        elif forecast.remaining_points <= 0:
+            forecast_lines = ["- All planned story points are done."]
+        elif forecast.days_left == 0:
+            forecast_lines = [f"- Sprint ended with {forecast.remaining_points:g} story points not done."]
+        else:
+            forecast_lines = [
+                f"- {forecast.remaining_points:g} of {forecast.total_points:g} points remaining, "
+                f"{forecast.days_left} days left ({forecast.trials} simulated sprints)",
+                f"- Chance to finish by {end_date}: {forecast.on_time_probability:.0%}",
+                f"- Likely finish: {forecast.finish_p50 or 'beyond horizon'} (50%), "
+                f"{forecast.finish_p85 or 'beyond horizon'} (85%)",
+                f"- Points done at sprint end: {forecast.end_points_p10:.0f} / {forecast.end_points_p50:.0f} / "
+                f"{forecast.end_points_p90:.0f} (p10/p50/p90, median {forecast.end_completion_p50:.0f}% complete)"
+            ]
+        return "SPRINT FORECAST:\n" + "\n".join(forecast_lines)
 
-SPRINT HEALTH FINDINGS:
-{chr(10).join(f"- {flag}" for flag in sprint_flags_flat) if sprint_flags_flat else "- No major sprint-level risks detected"}
+    @staticmethod
+    def findings_section(sprint_flags: Sequence[str]) -> str:
+        findings = "\n".join(f"- {flag}" for flag in sprint_flags) if sprint_flags \
+            else "- No major sprint-level risks detected"
+        return "SPRINT HEALTH FINDINGS:\n" + findings
 
-USER STORY DETAILS:
-{story_summary if story_summary else "- No stories assigned for this sprint"}
+    @staticmethod
+    def story_line(us: UserStory, reference_day: int) -> str:
+        assignee = us.assignee or "Unassigned"
+        status = us.status
+        days_active = reference_day - us.start_day if us.start_day != MISSING_DAY else "N/A"
+
+        est_days = us.story_points if us.story_points is not None else "?"
+        remaining = (
+            f"{int(est_days) - days_active} days left"
+            if isinstance(days_active, int) and est_days != "?"
+            else "N/A"
+        )
 
-DAILY TEAM UPDATES:
-{daily_update_summary if daily_update_summary else "- No updates submitted today"}
+        return (
+            f"- {us.id}: '{us.title}' → {assignee} | status: {status}, started: {us.start_date or 'N/A'}, "
+            f"est: {est_days}d, progress: {days_active}d active, {remaining}"
+        )
 
-WORKLOAD SUMMARY:
-{workload_summary if workload_summary else "- No workload data available"}
+    @staticmethod
+    def stories_section(stories: Sequence[UserStory], today: date) -> str:
+        # Ages of all stories against the one reference day
+        reference_day = today.toordinal()
+        story_summary = "\n".join(SystemContextGenerator.story_line(us, reference_day) for us in stories)
+        return "USER STORY DETAILS:\n" + (story_summary if story_summary else "- No stories assigned for this sprint")
 
-TEAM HEALTH ANALYSIS:
+    @staticmethod
+    def update_line(update: DailyUpdate) -> str:
+        mood = update.mood.capitalize()
+        blockers = ", ".join(update.blockers) if update.blockers else "None"
+        progress = ", ".join(update.achievements) if update.achievements else "None"
+        comments = update.comments or "No comment"
+        hours = f"{update.working_hours}h"
+
+        return (
+            f"- {update.member_id}: Mood: {mood} | Hours: {hours} | Blockers: {blockers} | "
+            f"Progress: {progress} | Notes: {comments}"
+        )
+
+    @staticmethod
+    def daily_updates_section(daily_updates: Sequence[DailyUpdate]) -> str:
+        daily_update_summary = "\n".join(SystemContextGenerator.update_line(update) for update in daily_updates)
+        return "DAILY TEAM UPDATES:\n" + (daily_update_summary if daily_update_summary
+                                          else "- No updates submitted today")
+
+    @staticmethod
+    def workload_line(w: WorkloadData) -> str:
+        return (
+            f"- {w.member_id}: Tasks → active: {w.active_tasks}, completed: {w.completed_tasks} | "
+            f"SLA breaches: {w.sla_breaches} | Overtime: {w.overtime_hours}h | "
+            f"Commits: {w.code_commits}, PRs: {w.pull_requests}"
+        )
+
+    @staticmethod
+    def workload_section(workload_data: Sequence[WorkloadData]) -> str:
+        workload_summary = "\n".join(SystemContextGenerator.workload_line(w) for w in workload_data)
+        return "WORKLOAD SUMMARY:\n" + (workload_summary if workload_summary else "- No workload data available")
+
+    @staticmethod
+    def team_health_section(correlation: dict) -> str:
+        return f"""TEAM HEALTH ANALYSIS:
 - Critical Issues: {', '.join(correlation['critical']) if correlation['critical'] else 'None'}
 - Overloaded members: {', '.join(correlation['overloaded']) if correlation['overloaded'] else 'None'}
 - Underutilized members: {', '.join(correlation['underutilized']) if correlation['underutilized'] else 'None'}
-- Burnout risk: {', '.join(correlation['burnout']) if correlation['burnout'] else 'None'}
+- Burnout risk: {', '.join(correlation['burnout']) if correlation['burnout'] else 'None'}"""
 
-KEY RECOMMENDATIONS:
-{chr(10).join(f"• {rec}" for rec in (sprint_recs_flat + correlation['recommendations']))
-    if sprint_recs_flat or correlation['recommendations']
-    else '• No immediate actions required'}
-
-Provide concise, actionable advice based on this data. Focus on practical solutions."""
-
-        return context
+    @staticmethod
+    def recommendations_section(recommendations: Sequence[str]) -> str:
+        lines = "\n".join(f"• {rec}" for rec in recommendations) if recommendations \
+            else "• No immediate actions required"
+        return "KEY RECOMMENDATIONS:\n" + lines
@@ -0,0 +1,179 @@
+"""
+Incremental trend statistics over sprint history.
+
+Each metric keeps a bounded window of recent values with running sums (rolling mean
+and standard deviation), a sorted copy of the window (percentiles) and an EWMA over
+the whole history, so appending a sprint costs the same however long the history is.
+A sprint is compared against the history *before* it: its z-score says how unusual
+it is relative to the previous `window` sprints.
+"""
+
+import copy
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from data_models import SprintStatus
+
+# Metric name -> SprintStatus attribute it is read from
+SPRINT_METRICS = {
+    "velocity": "velocity",
+    "completion": "completion",
+    "critical_bugs": "critical_bugs",
+}
+
+DEFAULT_WINDOW = 6
+DEFAULT_ALPHA = 0.5          # EWMA weight of the newest sprint
+ANOMALY_ZSCORE = 2.0
+MIN_HISTORY = 3              # Sprints needed before z-scores mean anything
+
+
+class RollingStats:
+    """O(1)-append rolling statistics of one metric."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, alpha: float = DEFAULT_ALPHA):
+        self.window = window
+        self.alpha = alpha
+        self.count = 0
+        self.last: Optional[float] = None
+        self.ewma: Optional[float] = None
+        self._values = deque()
+        self._sorted: List[float] = []
+        self._sum = 0.0
+        self._sum_squares = 0.0
+
+    def push(self, value: float):
+        self.count += 1
+        self.last = value
+        self.ewma = value if self.ewma is None else self.alpha * value + (1 - self.alpha) * self.ewma
+
+        self._values.append(value)
+        insort(self._sorted, value)
+        self._sum += value
+        self._sum_squares += value * value
+        if len(self._values) > self.window:
+            oldest = self._values.popleft()
+            del self._sorted[bisect_left(self._sorted, oldest)]
+            self._sum -= oldest
+            self._sum_squares -= oldest * oldest
+
+    @property
+    def size(self) -> int:
+        """Values currently in the window."""
+        return len(self._values)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / len(self._values) if self._values else None
+
+    @property
+    def std(self) -> Optional[float]:
+        """Sample standard deviation of the window."""
+        n = len(self._values)
+        if n < 2:
+            return None
+        variance = (self._sum_squares - self._sum * self._sum / n) / (n - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Linear-interpolated percentile (0-100) of the window."""
+        if not self._sorted:
+            return None
+        position = (len(self._sorted) - 1) * q / 100
+        lower = int(position)
+        upper = min(lower + 1, len(self._sorted) - 1)
+        return self._sorted[lower] + (self._sorted[upper] - self._sorted[lower]) * (position - lower)
+
+    def zscore(self, value: float) -> Optional[float]:
+        """How many window standard deviations `value` is from the window mean."""
+        std = self.std
+        if self.size < MIN_HISTORY or not std:
+            return None
+        return (value - self.mean) / std
+
+
+@dataclass
+class MetricTrend:
+    """One sprint's value of a metric, next to the statistics of the sprints before it."""
+    value: float
+    previous: Optional[float]
+    history: int                     # Sprints in the rolling window
+    mean: Optional[float]
+    std: Optional[float]
+    ewma: Optional[float]
+    p10: Optional[float]
+    p90: Optional[float]
+    zscore: Optional[float]
+
+    @property
+    def change(self) -> Optional[float]:
+        return self.value - self.previous if self.previous is not None else None
+
+    def is_anomaly(self, direction: int, threshold: float = ANOMALY_ZSCORE) -> bool:
+        """True if the z-score is beyond `threshold` in `direction` (-1 for low, 1 for high)."""
+        return self.zscore is not None and self.zscore * direction >= threshold
+
+
+@dataclass
+class SprintTrend:
+    sprint_name: str
+    previous_sprint: Optional[str]
+    metrics: Dict[str, MetricTrend] = field(default_factory=dict)
+
+
+class TrendEngine:
+    """Rolling statistics of every SPRINT_METRICS metric, fed one sprint at a time in order."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, alpha: float = DEFAULT_ALPHA):
+        self.stats = {metric: RollingStats(window, alpha) for metric in SPRINT_METRICS}
+        self.last_sprint: Optional[str] = None
+
+    @classmethod
+    def from_sprints(cls, sprints: Iterable[SprintStatus], **kwargs) -> "TrendEngine":
+        engine = cls(**kwargs)
+        for sprint in sprints:
+            engine.append(sprint)
+        return engine
+
+    def copy(self) -> "TrendEngine":
+        """Independent engine with the same history, to append to without changing this one."""
+        return copy.deepcopy(self)
+
+    def observe(self, sprint: SprintStatus) -> SprintTrend:
+        """Trend of `sprint` against the history so far, without adding it."""
+        trend = SprintTrend(sprint.sprint_name, self.last_sprint)
+        for metric, attribute in SPRINT_METRICS.items():
+            stats = self.stats[metric]
+            value = getattr(sprint, attribute)
+            trend.metrics[metric] = MetricTrend(
+                value=value,
+                previous=stats.last,
+                history=stats.size,
+                mean=stats.mean,
+                std=stats.std,
+                ewma=stats.ewma,
+                p10=stats.percentile(10),
+                p90=stats.percentile(90),
+                zscore=stats.zscore(value)
+            )
+        return trend
+
+    def append(self, sprint: SprintStatus) -> SprintTrend:
+        """Add the next sprint; returns its trend against the sprints before it."""
+        trend = self.observe(sprint)
+        for metric, attribute in SPRINT_METRICS.items():
+            self.stats[metric].push(getattr(sprint, attribute))
+        self.last_sprint = sprint.sprint_name
+        return trend
+
+    def summary(self, metric: str) -> Optional[str]:
+        """One-line rolling summary of a metric over the current window, e.g. for the context."""
+        stats = self.stats[metric]
+        if stats.size < 2:
+            return None
+        return (
+            f"mean {stats.mean:.1f} ± {stats.std:.1f} over last {stats.size} sprints, "
+            f"EWMA {stats.ewma:.1f}, p10–p90 {stats.percentile(10):.1f}–{stats.percentile(90):.1f}"
+        )
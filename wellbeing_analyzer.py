@@ -1,25 +1,31 @@
 
-from typing import List
-from data_models import AnalysisResult, DailyUpdate
+from typing import List, Optional
+from data_models import AnalysisResult, DailyUpdate, Signal
+from sentiment import DEFAULT_LEXICON, SentimentLexicon
 
 
 class WellbeingAnalyzer:
     @staticmethod
-    def analyze(daily_updates: List[DailyUpdate]) -> List[AnalysisResult]:
+    def analyze(daily_updates: List[DailyUpdate], lexicon: Optional[SentimentLexicon] = None) -> List[AnalysisResult]:
+        lexicon = lexicon or DEFAULT_LEXICON
+        sentiments = lexicon.score_many([update.comments for update in daily_updates])
         results = []
-        for update in daily_updates:
+        for update, sentiment in zip(daily_updates, sentiments):
             flags, recommendations = [], []
             risk = "low"
+            signals = Signal(0)
             
             # Mood check
             if update.mood in ["stressed", "burnout"]:
                 flags.append("High stress levels detected")
+                signals |= Signal.HIGH_STRESS
                 recommendations.append("Schedule 1:1 and reduce load")
                 risk = "high"
             
             # Blockers check
             if len(update.blockers) > 2:
                 flags.append("Multiple blockers")
+                signals |= Signal.MULTIPLE_BLOCKERS
                 recommendations.append("Resolve blockers")
                 if risk != "high":
                     risk = "medium"
@@ -27,18 +33,19 @@ class WellbeingAnalyzer:
             # Working hours check
             if update.working_hours > 9:
                 flags.append("Extended working hours")
+                signals |= Signal.EXTENDED_HOURS
                 recommendations.append("Monitor hours")
                 if risk != "high":
                     risk = "medium"
             
             # Sentiment analysis
-            negative_keywords = ["overwhelmed", "tired", "stressed", "frustrated"]
-            if any(keyword in update.comments.lower() for keyword in negative_keywords):
+            if sentiment.negative:
                 flags.append("Negative sentiment in feedback")
+                signals |= Signal.NEGATIVE_SENTIMENT
                 recommendations.append("Immediate support required")
                 risk = "high"
             
-            results.append(AnalysisResult("wellbeing", update.member_id, risk, flags, recommendations))
+            results.append(AnalysisResult("wellbeing", update.member_id, risk, flags, recommendations, signals))
         
         return results
 
@@ -1,5 +1,5 @@
 from typing import List
-from data_models import AnalysisResult, WorkloadData
+from data_models import AnalysisResult, WorkloadData, Signal
 
 
 class WorkloadAnalyzer:
@@ -9,22 +9,26 @@ class WorkloadAnalyzer:
         for data in workload_data:
             flags, recommendations = [], []
             risk = "low"
+            signals = Signal(0)
             
             # High task load check
             if data.active_tasks > 10:
                 flags.append("High task load")
+                signals |= Signal.HIGH_TASK_LOAD
                 recommendations.append("Redistribute tasks")
                 risk = "high"
             
             # Overtime check
             if data.overtime_hours > 10:
                 flags.append("Excessive overtime")
+                signals |= Signal.EXCESSIVE_OVERTIME
                 recommendations.append("Reduce workload")
                 risk = "high"
             
             # SLA breach check
             if data.sla_breaches > 1:
                 flags.append("SLA violations detected")
+                signals |= Signal.SLA_VIOLATIONS
                 recommendations.append("Review deadlines")
                 if risk != "high":
                     risk = "medium"
@@ -32,8 +36,9 @@ class WorkloadAnalyzer:
             # Underutilization check
             if data.active_tasks < 4 and data.overtime_hours < 3:
                 flags.append("Underutilized capacity")
+                signals |= Signal.UNDERUTILIZED
                 recommendations.append("Assign more tasks")
             
-            results.append(AnalysisResult("workload", data.member_id, risk, flags, recommendations))
+            results.append(AnalysisResult("workload", data.member_id, risk, flags, recommendations, signals))
         
         return results